@@ -1,38 +1,62 @@
 """Support for HIQ-Home."""
 from __future__ import annotations
 
+import asyncio
+from copy import deepcopy
+from typing import Any
+
 import homeassistant.helpers.config_validation as cv
 import homeassistant.helpers.device_registry as dr
 import voluptuous as vol
 from homeassistant.components.binary_sensor import DOMAIN as BINARY_SENSOR_DOMAIN
+from homeassistant.components.climate import ATTR_HVAC_MODE
+from homeassistant.components.climate import ATTR_PRESET_MODE
+from homeassistant.components.climate import ClimateEntity
+from homeassistant.components.climate import DOMAIN as CLIMATE_DOMAIN
+from homeassistant.components.climate import HVACMode
 from homeassistant.components.sensor import DOMAIN as SENSOR_DOMAIN
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import ATTR_DEVICE_ID
 from homeassistant.const import ATTR_ENTITY_ID
+from homeassistant.const import ATTR_STATE
+from homeassistant.const import ATTR_TEMPERATURE
 from homeassistant.const import CONF_ADDRESS
+from homeassistant.const import CONF_ENTITIES
 from homeassistant.const import CONF_HOST
 from homeassistant.const import CONF_PORT
 from homeassistant.const import CONF_VALUE_TEMPLATE
+from homeassistant.const import STATE_OFF
+from homeassistant.const import STATE_ON
 from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
 from homeassistant.core import ServiceCall
+from homeassistant.helpers.service import async_extract_referenced_entity_ids
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.trigger_template_entity import (
     TEMPLATE_SENSOR_BASE_SCHEMA,
 )
 
+from .const import CONF_EDGE_TAGS
 from .const import CONF_TAG
+from .const import DATA_BREAKERS
 from .const import DEFAULT_HOST
 from .const import DEFAULT_PORT
 from .const import DOMAIN
 from .const import LOGGER
 from .const import SERVICE_ALARM
+from .const import SERVICE_APPLY_SCENE
 from .const import SERVICE_CHARGE_OFF
 from .const import SERVICE_CHARGE_ON
 from .const import SERVICE_HOME
 from .const import SERVICE_PRECEDE
 from .const import SERVICE_PRESENCE_SIGNAL
+from .const import SERVICE_SET_ZONES
 from .const import SERVICE_WRITE_TAG
+from .const import STORAGE_VERSION
 from .coordinator import HiqDataUpdateCoordinator
+from .coordinator import HiqWriteRequest
+from .edge import HiqEdgeCapture
+from .energy import HiqEnergyStatistics
 
 PLATFORMS = [
     Platform.BINARY_SENSOR,
@@ -47,6 +71,9 @@ PLATFORMS = [
     Platform.SWITCH,
 ]
 
+# platforms with custom entities in the options
+CUSTOM_PLATFORMS = (SENSOR_DOMAIN, BINARY_SENSOR_DOMAIN)
+
 PLC_SCHEMA = {
     vol.Required(CONF_HOST, default=DEFAULT_HOST): cv.string,
     vol.Required(CONF_PORT, default=DEFAULT_PORT): cv.port,
@@ -73,6 +100,46 @@ COMBINED_SCHEMA = vol.Schema(
     }
 )
 
+
+def _convert_scene_states(
+    states: dict[str, Any],
+) -> dict[str, tuple[str | None, dict[str, Any]]]:
+    """Convert scene state definitions to (state, attributes) tuples."""
+    result: dict[str, tuple[str | None, dict[str, Any]]] = {}
+    for entity_id, info in states.items():
+        entity_id = cv.entity_id(entity_id)
+        if isinstance(info, dict):
+            attributes = dict(info)
+            state = attributes.pop(ATTR_STATE, None)
+        else:
+            state = info
+            attributes = {}
+        # YAML translates 'on' to a boolean
+        if isinstance(state, bool):
+            state = STATE_ON if state else STATE_OFF
+        elif state is not None and not isinstance(state, str):
+            raise vol.Invalid(f"State for {entity_id} should be a string")
+        result[entity_id] = (state, attributes)
+    return result
+
+
+APPLY_SCENE_SCHEMA = vol.Schema(
+    {vol.Required(CONF_ENTITIES): vol.All(dict, _convert_scene_states)}
+)
+
+SET_ZONES_SCHEMA = vol.All(
+    cv.make_entity_service_schema(
+        {
+            vol.Optional(ATTR_TEMPERATURE): vol.Coerce(float),
+            vol.Optional(ATTR_PRESET_MODE): cv.string,
+            vol.Optional(ATTR_HVAC_MODE): vol.In(
+                [HVACMode.OFF, HVACMode.HEAT, HVACMode.COOL]
+            ),
+        }
+    ),
+    cv.has_at_least_one_key(ATTR_TEMPERATURE, ATTR_PRESET_MODE, ATTR_HVAC_MODE),
+)
+
 CONFIG_SCHEMA = vol.Schema(
     {vol.Optional(DOMAIN): vol.All(cv.ensure_list, [COMBINED_SCHEMA])},
     extra=vol.ALLOW_EXTRA,
@@ -114,16 +181,37 @@ async def async_migrate_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up HIQ from a config entry."""
     coordinator = HiqDataUpdateCoordinator(hass, entry=entry)
+    await coordinator.outbox.async_load()
+    await coordinator.async_load_alc()
 
     await coordinator.async_config_entry_first_refresh()
+    await coordinator.async_plan_discovery()
 
     hass.data.setdefault(DOMAIN, {})[entry.entry_id] = coordinator
 
     # Set up all platforms for this device/entry.
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
-    # Reload entry when its updated.
-    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+    # Apply changed options (reload the entry if required).
+    entry.async_on_unload(entry.add_update_listener(async_update_options))
+
+    # hourly energy statistics of the power meter
+    power_tag = f"{coordinator.unique_id}.power_meter_power"
+    if (
+        "recorder" in hass.config.components
+        and power_tag in coordinator.data.plc_info.plc_vars
+    ):
+        energy = HiqEnergyStatistics(hass, coordinator, power_tag)
+        await energy.async_start()
+        entry.async_on_unload(energy.async_stop)
+
+    # high rate sampling of selected tags
+    if edge_tags := entry.options.get(CONF_EDGE_TAGS):
+        edge = HiqEdgeCapture(
+            hass, coordinator, [f"{coordinator.unique_id}.{tag}" for tag in edge_tags]
+        )
+        edge.async_start()
+        entry.async_on_unload(edge.async_stop)
 
     # Add service handler(s)
     async def handle_presence_signal(call: ServiceCall) -> None:
@@ -179,7 +267,40 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         write_tags = _get_tag_list(hass, call.data, call.data["tag"])
         for write_tag in write_tags:
             LOGGER.debug("Write tag '%s' to '%s'", write_tag, call.data["value"])
-            await coordinator.cybro.write_var(write_tag, call.data["value"])
+            await coordinator.async_write(
+                {write_tag: call.data["value"]}, refresh=False
+            )
+
+    async def handle_apply_scene(call: ServiceCall) -> None:
+        """Handle service call to apply states to many entities at once."""
+        await _async_apply_states(hass, call.data[CONF_ENTITIES])
+
+    async def handle_set_zones(call: ServiceCall) -> None:
+        """Handle service call to set many thermostats at once."""
+        attributes = {
+            key: call.data[key]
+            for key in (ATTR_TEMPERATURE, ATTR_PRESET_MODE)
+            if key in call.data
+        }
+        selected = async_extract_referenced_entity_ids(hass, call)
+        entity_ids = []
+        for entity_id in selected.referenced | selected.indirectly_referenced:
+            if entity_id.startswith(f"{CLIMATE_DOMAIN}.") and any(
+                # the thermostats are the only HIQ climate entities
+                isinstance(hiq.entities.get(entity_id), ClimateEntity)
+                for hiq in hass.data[DOMAIN].values()
+            ):
+                entity_ids.append(entity_id)
+            elif entity_id in selected.referenced:
+                # other entities of a targeted area / device are skipped silently
+                LOGGER.warning("'%s' is no HIQ thermostat, skipped", entity_id)
+        await _async_apply_states(
+            hass,
+            {
+                entity_id: (call.data.get(ATTR_HVAC_MODE), attributes)
+                for entity_id in entity_ids
+            },
+        )
 
     hass.services.async_register(
         DOMAIN, SERVICE_PRESENCE_SIGNAL, handle_presence_signal
@@ -190,10 +311,46 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     hass.services.async_register(DOMAIN, SERVICE_ALARM, handle_alarm_event)
     hass.services.async_register(DOMAIN, SERVICE_PRECEDE, handle_precede_event)
     hass.services.async_register(DOMAIN, SERVICE_WRITE_TAG, handle_write_tag)
+    hass.services.async_register(
+        DOMAIN, SERVICE_APPLY_SCENE, handle_apply_scene, schema=APPLY_SCENE_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_SET_ZONES, handle_set_zones, schema=SET_ZONES_SCHEMA
+    )
 
     return True
 
 
+async def _async_apply_states(
+    hass: HomeAssistant, states: dict[str, tuple[str | None, dict[str, Any]]]
+) -> None:
+    """Write the states of many entities with one request per controller."""
+    writes: dict[HiqDataUpdateCoordinator, list[HiqWriteRequest]] = {}
+    for entity_id, (state, attributes) in states.items():
+        for hiq_coordinator in hass.data[DOMAIN].values():
+            if (entity := hiq_coordinator.entities.get(entity_id)) is not None:
+                break
+        else:
+            LOGGER.warning("'%s' is no HIQ entity", entity_id)
+            continue
+        if (request := entity.get_scene_write(state, attributes)) is None:
+            LOGGER.warning(
+                "'%s' does not support state '%s' %s",
+                entity_id,
+                state,
+                attributes,
+            )
+            continue
+        writes.setdefault(hiq_coordinator, []).append(request)
+    # one request (and one read back) per controller
+    await asyncio.gather(
+        *(
+            hiq_coordinator.async_write_many(requests)
+            for hiq_coordinator, requests in writes.items()
+        )
+    )
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload HIQ config entry."""
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
@@ -203,6 +360,7 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         # Ensure disconnected and cleanup stop sub
         if coordinator.unsub:
             coordinator.unsub()
+        await coordinator.cybro.disconnect()
 
         hass.data[DOMAIN].pop(entry.entry_id)
         if not hass.data[DOMAIN]:
@@ -213,11 +371,44 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             hass.services.async_remove(DOMAIN, SERVICE_ALARM)
             hass.services.async_remove(DOMAIN, SERVICE_PRECEDE)
             hass.services.async_remove(DOMAIN, SERVICE_WRITE_TAG)
+            hass.services.async_remove(DOMAIN, SERVICE_APPLY_SCENE)
+            hass.services.async_remove(DOMAIN, SERVICE_SET_ZONES)
         del hass.data[DOMAIN]
+        hass.data.pop(DATA_BREAKERS, None)
 
     return unload_ok
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the stored data of a HIQ config entry."""
+    for key in ("voltage_scale", "outbox", "alc"):
+        await Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}.{key}"
+        ).async_remove()
+
+
+async def async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Apply changed options, custom entities are changed without a reload."""
+    coordinator: HiqDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+    options = dict(entry.options)
+    old_options = coordinator.options
+    if set(coordinator.custom_entities) == set(CUSTOM_PLATFORMS) and _without_custom(
+        options
+    ) == _without_custom(old_options):
+        coordinator.options = deepcopy(options)
+        for platform, custom_entities in coordinator.custom_entities.items():
+            await custom_entities.async_update(options.get(platform, []))
+        return
+    await async_reload_entry(hass, entry)
+
+
+def _without_custom(options: dict[str, Any]) -> dict[str, Any]:
+    """Return the options without the custom entities."""
+    return {
+        key: value for key, value in options.items() if key not in CUSTOM_PLATFORMS
+    }
+
+
 async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Reload the config entry when it changed."""
     await hass.config_entries.async_reload(entry.entry_id)
@@ -258,29 +449,28 @@ def _get_tag_list(hass: HomeAssistant, data: dict, tag_name: str) -> list:
     return []
 
 
+# config group write request of the thermostat config tags
+TH_CONFIG_WRITE_REQ = {
+    "temperature_source": "config1_req",
+    "temperature_offset": "config1_req",
+    "fan_options": "config1_req",
+    "display_mode": "config1_req",
+    "setpoint_idle": "config2_req",
+    "setpoint_lo": "config2_req",
+    "setpoint_hi": "config2_req",
+    "max_time": "config2_req",
+    "lightness_day": "config3_req",
+    "lightness_night": "config3_req",
+    "window_enable": "config3_req",
+    "beep_enable": "config3_req",
+    "dndmmr_enable": "config4_req",
+}
+
+
 def get_write_req_th(key: str, unique_id: str) -> str | None:
     """Return write req tag for THs or None."""
-    if key in (
-        f"{unique_id}_temperature_source",
-        f"{unique_id}_temperature_offset",
-        f"{unique_id}_fan_options",
-        f"{unique_id}_display_mode",
-    ):
-        return f"{unique_id}_config1_req"
-    if key in (
-        f"{unique_id}_setpoint_idle",
-        f"{unique_id}_setpoint_lo",
-        f"{unique_id}_setpoint_hi",
-        f"{unique_id}_max_time",
-    ):
-        return f"{unique_id}_config2_req"
-    if key in (
-        f"{unique_id}_lightness_day",
-        f"{unique_id}_lightness_night",
-        f"{unique_id}_window_enable",
-        f"{unique_id}_beep_enable",
-    ):
-        return f"{unique_id}_config3_req"
-    if key in (f"{unique_id}_dndmmr_enable",):
-        return f"{unique_id}_config4_req"
-    return None
+    if not key.startswith(prefix := f"{unique_id}_"):
+        return None
+    if (write_req := TH_CONFIG_WRITE_REQ.get(key[len(prefix) :])) is None:
+        return None
+    return f"{prefix}{write_req}"
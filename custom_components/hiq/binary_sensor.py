@@ -4,11 +4,16 @@ from __future__ import annotations
 from dataclasses import dataclass
 from re import search
 from re import sub
+from typing import Any
 
+from homeassistant.components.binary_sensor import DOMAIN as BINARY_SENSOR_DOMAIN
 from homeassistant.components.binary_sensor import BinarySensorDeviceClass
 from homeassistant.components.binary_sensor import BinarySensorEntity
 from homeassistant.components.binary_sensor import BinarySensorEntityDescription
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_DEVICE_CLASS
+from homeassistant.const import CONF_NAME
+from homeassistant.const import CONF_VALUE_TEMPLATE
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers import template
 from homeassistant.helpers.entity import DeviceInfo
@@ -20,6 +25,7 @@ from .const import AREA_CLIMATE
 from .const import AREA_SYSTEM
 from .const import ATTR_DESCRIPTION
 from .const import ATTR_VARIABLE
+from .const import CONF_TAG
 from .const import DEVICE_DESCRIPTION
 from .const import DEVICE_HW_VERSION
 from .const import DEVICE_SW_VERSION
@@ -28,6 +34,7 @@ from .const import MANUFACTURER
 from .const import MANUFACTURER_URL
 from .coordinator import HiqDataUpdateCoordinator
 from .light import is_general_error_ok
+from .models import HiqCustomEntities
 from .models import HiqEntity
 
 TEMPLATE_INVERTED = "{{value | string() == '0'}}"
@@ -55,6 +62,36 @@ async def async_setup_entry(
     if th_tags is not None:
         async_add_entities(th_tags)
 
+    # add custom defined binary sensors, changed later without a reload
+    custom_sensors = HiqCustomBinarySensors(hass, coordinator, async_add_entities)
+    coordinator.custom_entities[BINARY_SENSOR_DOMAIN] = custom_sensors
+    await custom_sensors.async_update(
+        entry.options.get(BINARY_SENSOR_DOMAIN, []), refresh=False
+    )
+
+
+class HiqCustomBinarySensors(HiqCustomEntities):
+    """Custom binary sensors of the config entry options."""
+
+    def _create_entity(self, sensor: dict[str, Any]) -> HiqBinarySensor:
+        """Create the entity of a custom binary sensor."""
+        value_string = sensor.get(CONF_VALUE_TEMPLATE)
+        device_class = sensor.get(CONF_DEVICE_CLASS)
+        return HiqBinarySensor(
+            self.coordinator,
+            entity_description=HiqBinarySensorEntityDescription(
+                key=f"c{self.coordinator.cybro.nad}.{sensor[CONF_TAG]}",
+                name=sensor.get(CONF_NAME, sensor[CONF_TAG]),
+                device_class=BinarySensorDeviceClass(device_class)
+                if device_class is not None
+                else None,
+            ),
+            dev_info=self._dev_info,
+            value_template=Template(value_string, self.hass)
+            if value_string is not None
+            else None,
+        )
+
 
 @dataclass
 class HiqBinarySensorEntityDescription(BinarySensorEntityDescription):
@@ -144,7 +181,7 @@ def add_th_tags(
     res: list[HiqBinarySensor] = []
 
     # find different plc diagnostic vars
-    for key in coordinator.data.plc_info.plc_vars:
+    for key in coordinator.discovery.keys("th"):
         # get window contact input
         if search(r"c\d+\.th\d+_ix00", key):
             if is_general_error_ok(coordinator, key):
@@ -232,7 +269,7 @@ class HiqBinarySensor(HiqEntity, BinarySensorEntity):
         self.entity_description = entity_description
         self._attr_unique_id = unique_id or entity_description.key
         self._attr_device_info = dev_info
-        coordinator.data.add_var(self._attr_unique_id, var_type=0)
+        coordinator.add_var(self._attr_unique_id, var_type=0)
         self._value_template = value_template
 
     @property
@@ -253,10 +290,7 @@ class HiqBinarySensor(HiqEntity, BinarySensorEntity):
     @property
     def extra_state_attributes(self):
         """Return the state attributes."""
-        try:
-            desc = self.coordinator.data.vars[self._attr_unique_id].description
-        except KeyError:
-            desc = "?"
+        desc = self.coordinator.get_description(self._attr_unique_id)
         return {
             ATTR_DESCRIPTION: desc,
             ATTR_VARIABLE: self._attr_unique_id,
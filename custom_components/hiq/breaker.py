@@ -0,0 +1,97 @@
+"""Circuit breaker for the requests to a scgi server."""
+from __future__ import annotations
+
+from random import uniform
+
+from homeassistant.core import HomeAssistant
+from homeassistant.core import callback
+
+from .const import BREAKER_BACKOFF_BASE
+from .const import BREAKER_BACKOFF_MAX
+from .const import BREAKER_FAILURES
+from .const import DATA_BREAKERS
+from .const import LOGGER
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+class HiqCircuitBreaker:
+    """Stop sending requests to a scgi server which does not respond.
+
+    The breaker opens after some consecutive connection errors and blocks all
+    requests to the server, for all controllers on it. After an exponential
+    backoff with jitter, a single cheap probe request is allowed (half open).
+    The breaker closes again if the probe succeeds, otherwise the backoff is
+    doubled.
+    """
+
+    def __init__(self, hass: HomeAssistant, server: str) -> None:
+        """Initialize the breaker of a scgi server (host:port)."""
+        self.hass = hass
+        self.server = server
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self._opened = 0
+        self._retry_at = 0.0
+
+    @property
+    def retry_in(self) -> float | None:
+        """Return the time until the next probe [s] of an open breaker."""
+        if self.state != STATE_OPEN:
+            return None
+        return max(self._retry_at - self.hass.loop.time(), 0.0)
+
+    @callback
+    def async_allow(self) -> bool:
+        """Return True if a request may be sent.
+
+        Of an open breaker only the first caller after the backoff is allowed,
+        it has to send the probe request (state is half open then).
+        """
+        if self.state == STATE_CLOSED:
+            return True
+        if self.state == STATE_OPEN and self.hass.loop.time() >= self._retry_at:
+            self.state = STATE_HALF_OPEN
+            return True
+        return False
+
+    @callback
+    def async_success(self) -> None:
+        """Record a successful request."""
+        if self.state != STATE_CLOSED:
+            LOGGER.info("scgi server %s is reachable again", self.server)
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self._opened = 0
+
+    @callback
+    def async_failure(self) -> None:
+        """Record a failed request (connection error)."""
+        self.failures += 1
+        if self.state == STATE_OPEN:
+            return
+        if self.state == STATE_CLOSED and self.failures < BREAKER_FAILURES:
+            return
+        backoff = min(BREAKER_BACKOFF_BASE * 2**self._opened, BREAKER_BACKOFF_MAX)
+        backoff = uniform(backoff / 2, backoff)
+        self._opened += 1
+        self._retry_at = self.hass.loop.time() + backoff
+        if self.state == STATE_CLOSED:
+            LOGGER.warning(
+                "scgi server %s not reachable, next try in %.0f s",
+                self.server,
+                backoff,
+            )
+        self.state = STATE_OPEN
+
+
+@callback
+def async_get_breaker(hass: HomeAssistant, host: str, port: int) -> HiqCircuitBreaker:
+    """Return the circuit breaker of a scgi server, shared by its controllers."""
+    breakers: dict[str, HiqCircuitBreaker] = hass.data.setdefault(DATA_BREAKERS, {})
+    server = f"{host}:{port}"
+    if (breaker := breakers.get(server)) is None:
+        breaker = breakers[server] = HiqCircuitBreaker(hass, server)
+    return breaker
@@ -62,19 +62,13 @@ def add_hvac_tags(
     res: list[HiqButtonEntity] = []
 
     # find all thermostats
-    thermostats = []
-    for key in coordinator.data.plc_info.plc_vars:
-        # identifier is cNAD.thNR
-        grp = search(r"c\d+\.th\d+", key)
-        if grp:
-            thermostats.append(grp.group())
-    thermostats = list(dict.fromkeys(thermostats))
+    thermostats = coordinator.discovery.thermostats
     if len(thermostats) == 0:
         return None
 
     # find all hvac tags
     hvacs = []
-    for key in coordinator.data.plc_info.plc_vars:
+    for key in coordinator.discovery.keys("hvac"):
         # identifier is cNAD.thNR
         grp = search(r"c\d+\.hvac_.*", key)
         if grp:
@@ -187,16 +181,13 @@ class HiqButtonEntity(HiqEntity, ButtonEntity):
         self._var_value = var_value
 
         LOGGER.debug(self._attr_unique_id)
-        coordinator.data.add_var(self._attr_unique_id, var_type=VarType.INT)
+        coordinator.add_var(self._attr_unique_id, var_type=VarType.INT)
         self._var_type = VarType.INT
 
     @property
     def extra_state_attributes(self):
         """Return the state attributes."""
-        try:
-            desc = self.coordinator.data.vars[self._attr_unique_id].description
-        except KeyError:
-            desc = "?"
+        desc = self.coordinator.get_description(self._attr_unique_id)
         return {
             ATTR_DESCRIPTION: desc,
             ATTR_VARIABLE: self._attr_unique_id,
@@ -0,0 +1,53 @@
+"""Variable catalog of a HIQ controller."""
+from __future__ import annotations
+
+from re import split
+
+
+class HiqTagCatalog:
+    """Sorted variables of a controller (without prefix), grouped by module.
+
+    The module of a variable is its name up to the first "_" or ".",
+    eg: th00 for th00_setpoint.
+    """
+
+    __slots__ = ("prefix", "tags", "modules", "_lower")
+
+    def __init__(self, prefix: str, plc_vars: dict[str, str]) -> None:
+        """Build the catalog of all variables with the controller prefix."""
+        self.prefix = prefix
+        self.tags: list[str] = sorted(
+            var[len(prefix) :] for var in plc_vars if var.startswith(prefix)
+        )
+        self.modules: dict[str, list[str]] = {}
+        for tag in self.tags:
+            self.modules.setdefault(tag_module(tag), []).append(tag)
+        self._lower: dict[str, str] = {tag: tag.lower() for tag in self.tags}
+
+    def __contains__(self, tag: str) -> bool:
+        """Return True if the variable (without prefix) exists."""
+        return tag in self._lower
+
+    def search(self, module: str | None = None, text: str | None = None) -> list[str]:
+        """Return the variables of a module containing a text (case insensitive)."""
+        tags = self.tags if not module else self.modules.get(module, [])
+        if not text:
+            return tags
+        text = text.lower()
+        return [tag for tag in tags if text in self._lower[tag]]
+
+
+def tag_module(tag: str) -> str:
+    """Return the module of a variable (without prefix)."""
+    return split(r"[_.]", tag, maxsplit=1)[0]
+
+
+def get_page(tags: list[str], page: int, page_size: int) -> list[str]:
+    """Return a page (starting with 1) of a variable list."""
+    page = min(max(page, 1), page_count(tags, page_size))
+    return tags[(page - 1) * page_size : page * page_size]
+
+
+def page_count(tags: list[str], page_size: int) -> int:
+    """Return the number of pages of a variable list."""
+    return max((len(tags) + page_size - 1) // page_size, 1)
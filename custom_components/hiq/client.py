@@ -0,0 +1,217 @@
+"""Cybro scgi server client of HIQ-Home."""
+from __future__ import annotations
+
+import asyncio
+import socket
+from collections.abc import Awaitable
+from collections.abc import Callable
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import Any
+from xml.etree.ElementTree import ParseError
+from xml.etree.ElementTree import XMLPullParser
+
+import aiohttp
+import backoff
+from cybro import Cybro
+from cybro import CybroConnectionError
+from cybro import CybroConnectionTimeoutError
+from cybro import CybroError
+from yarl import URL
+
+from .const import LOGGER
+from .const import XML_CHUNK_SIZE
+from .const import XML_EXECUTOR_SIZE
+
+
+@dataclass(frozen=True)
+class HiqAlcFile:
+    """Allocation file (variable list) of a PLC program."""
+
+    timestamp: str
+    """time and date when the program was sent to the controller"""
+    alc_file: str
+    """allocation file, directly from the Cybro file system"""
+
+
+class HiqResponseParser:
+    """Incremental parser of a scgi server response.
+
+    Only the variables are kept (in the format of the cybro library), the
+    parsed elements are dropped at once instead of building the whole
+    document first.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the parser of one response."""
+        self._parser = XMLPullParser(events=("end",))
+        self._vars: list[dict[str, str | None]] = []
+
+    def feed(self, chunk: bytes) -> None:
+        """Parse the next chunk of the response."""
+        self._parser.feed(chunk)
+        self._read_vars()
+
+    def close(self, chunks: Iterable[bytes] = ()) -> dict[str, Any] | None:
+        """Parse the remaining chunks and return the variables of the response."""
+        for chunk in chunks:
+            self.feed(chunk)
+        self._parser.close()
+        self._read_vars()
+        return {"var": self._vars} if self._vars else None
+
+    def _read_vars(self) -> None:
+        """Move the completely parsed variables into the result."""
+        for _event, element in self._parser.read_events():
+            if element.tag == "var":
+                self._vars.append({child.tag: child.text for child in element})
+                element.clear()
+
+
+class HiqCybro(Cybro):
+    """Cybro client which downloads the allocation file only if it changed.
+
+    A full update reads sys.alc_file (the largest response by far) together
+    with sys.timestamp. The allocation file of the last known program is
+    kept, so it is only requested again when the timestamp of the program
+    on the controller changed.
+
+    Responses are parsed while they are received, the rest of a large
+    response is parsed in the executor.
+    """
+
+    alc: HiqAlcFile | None = None
+    executor: Callable[..., Awaitable[Any]] | None = None
+    _close_session: bool = False
+
+    async def request(self, data: dict | str | None = None) -> Any:
+        """Handle a request, answer sys.alc_file from the known program."""
+        alc_tag = f"c{self.nad}.sys.alc_file"
+        if not isinstance(data, dict) or alc_tag not in data:
+            return await self._async_request(data)
+        if self.alc is None:
+            response = await self._async_request(data)
+            self._update_alc(response)
+            return response
+
+        response = await self._async_request(
+            {tag: value for tag, value in data.items() if tag != alc_tag}
+        )
+        if not response:
+            return response
+        variables = _get_vars(response)
+        timestamp = next(
+            (
+                var.get("value")
+                for var in variables
+                if var.get("name") == f"c{self.nad}.sys.timestamp"
+            ),
+            None,
+        )
+        if timestamp == self.alc.timestamp:
+            variables.append(
+                {"name": alc_tag, "value": self.alc.alc_file, "description": None}
+            )
+        else:
+            LOGGER.debug("c%s: program changed, read allocation file", self.nad)
+            if alc_response := await self._async_request({alc_tag: ""}):
+                variables.extend(_get_vars(alc_response))
+        response["var"] = variables
+        self._update_alc(response)
+        return response
+
+    async def disconnect(self) -> None:
+        """Close the session, only if it was created by this client."""
+        if self._close_session and self.session is not None:
+            await self.session.close()
+            self.session = None
+            self._close_session = False
+
+    @backoff.on_exception(
+        backoff.expo,
+        (CybroConnectionError, CybroConnectionTimeoutError, CybroError),
+        max_tries=3,
+        logger=None,
+    )
+    async def _async_request(self, data: dict | str | None = None) -> Any:
+        """Send a request to the scgi server and parse the response.
+
+        Retried like Cybro.request, which this replaces.
+        """
+        # the query is built the same way as in Cybro.request
+        url = URL.build(
+            scheme="http",
+            host=self.host,
+            port=self.port,
+            path=self.path,
+            **({"query_string": data} if isinstance(data, str) else {"query": data}),
+        )
+        # the scgi server expects names without "=" for reads
+        url_fixed = str(url).replace("=&", "&").removesuffix("=")
+
+        if self.session is None:
+            self.session = aiohttp.ClientSession()
+            self._close_session = True
+
+        parser = HiqResponseParser()
+        pending: list[bytes] = []
+        size = 0
+        try:
+            async with asyncio.timeout(self.request_timeout), self.session.get(
+                url=url_fixed,
+                allow_redirects=False,
+                ssl=False,
+                headers={"Accept": "text/plain, */*"},
+            ) as response:
+                if response.status // 100 in [4, 5]:
+                    contents = await response.read()
+                    raise CybroError(
+                        response.status, {"message": contents.decode("utf8")}
+                    )
+                async for chunk in response.content.iter_chunked(XML_CHUNK_SIZE):
+                    size += len(chunk)
+                    if size <= XML_EXECUTOR_SIZE or self.executor is None:
+                        parser.feed(chunk)
+                    else:
+                        pending.append(chunk)
+            if pending:
+                LOGGER.debug("c%s: parse %s bytes in executor", self.nad, size)
+                return await self.executor(parser.close, pending)
+            return parser.close()
+        except TimeoutError as exception:
+            raise CybroConnectionTimeoutError(
+                f"Timeout occurred while connecting to server at {self.host}:{self.port}"
+            ) from exception
+        except (aiohttp.ClientError, socket.gaierror) as exception:
+            raise CybroConnectionError(
+                f"Error occurred while communicating with server at {self.host}:{self.port}"
+            ) from exception
+        except ParseError as exception:
+            raise CybroError(
+                f"Invalid response from server at {self.host}:{self.port}"
+            ) from exception
+
+    def _update_alc(self, response: Any) -> None:
+        """Remember the allocation file of a response."""
+        if not response:
+            return
+        values = {
+            var.get("name"): var.get("value")
+            for var in _get_vars(response)
+            if var.get("name")
+            in (f"c{self.nad}.sys.timestamp", f"c{self.nad}.sys.alc_file")
+        }
+        alc_file = values.get(f"c{self.nad}.sys.alc_file")
+        timestamp = values.get(f"c{self.nad}.sys.timestamp")
+        if not alc_file or not timestamp:
+            return
+        if self.alc != (alc := HiqAlcFile(timestamp, alc_file)):
+            self.alc = alc
+
+
+def _get_vars(response: dict[str, Any]) -> list[dict[str, Any]]:
+    """Return the variables of a response as list (a single one is no list)."""
+    variables = response.get("var") or []
+    if isinstance(variables, dict):
+        return [variables]
+    return list(variables)
@@ -1,14 +1,19 @@
 """Support for HIQ-Home climate device."""
 from __future__ import annotations
 
+from collections.abc import Iterator
+from dataclasses import dataclass
 from re import search
+from sys import intern
 from typing import Any
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
+from homeassistant.core import callback
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.components.climate import (
+    ATTR_PRESET_MODE,
     ClimateEntity,
     ClimateEntityFeature,
     HVACAction,
@@ -37,6 +42,7 @@ from .const import (
     MANUFACTURER,
 )
 from .coordinator import HiqDataUpdateCoordinator
+from .coordinator import HiqWriteRequest
 from .models import HiqEntity
 from .light import is_general_error_ok
 from . import get_write_req_th
@@ -122,7 +128,7 @@ def find_thermostats(
     res: list[HiqThermostat] = []
 
     # find thermostats (general_error)
-    for key in coordinator.data.plc_info.plc_vars:
+    for key in coordinator.discovery.keys("th"):
         if search(r"c\d+\.th\d+_general_error", key):
             if is_general_error_ok(coordinator, key):
                 unique_id = key
@@ -143,6 +149,55 @@ def find_thermostats(
     return None
 
 
+class HiqThermostatTags:
+    """Tag names of a thermostat, resolved and interned once at construction."""
+
+    SUFFIXES = {
+        "active": "_active",
+        "output": "_output",
+        "setpoint_lo": "_setpoint_lo",
+        "setpoint_hi": "_setpoint_hi",
+        "temperature": "_temperature",
+        "floor_tmp": "_floor_tmp",
+        "humidity": "_humidity",
+        "setpoint": "_setpoint",
+        "setpoint_idle": "_setpoint_idle",
+        "setpoint_offset": "_setpoint_offset",
+        "setpoint_active": "_setpoint_active",
+        "fan_limit": "_fan_limit",
+        "fan_options": "_fan_options",
+    }
+    __slots__ = tuple(SUFFIXES)
+
+    def __init__(self, prefix: str) -> None:
+        """Build all tag names from the thermostat prefix, eg: c1000.th00."""
+        for name, suffix in self.SUFFIXES.items():
+            setattr(self, name, intern(f"{prefix}{suffix}"))
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over all tag names."""
+        return (getattr(self, name) for name in self.SUFFIXES)
+
+
+@dataclass(frozen=True)
+class HiqThermostatState:
+    """State of a thermostat, derived once per coordinator update."""
+
+    mode: HVACMode
+    """hvac mode of the controller (heat / cool / off)"""
+    hvac_mode: HVACMode | None
+    hvac_modes: list[HVACMode]
+    hvac_action: HVACAction | None
+    preset_mode: str | None
+    preset_modes: list[str] | None
+    target_temperature: float | None
+    min_temp: float
+    max_temp: float
+    current_temperature: float | None
+    current_humidity: float | None
+    attributes: dict[str, Any]
+
+
 class HiqThermostat(HiqEntity, ClimateEntity):
     """Representation a Hiq thermostat."""
 
@@ -178,89 +233,150 @@ class HiqThermostat(HiqEntity, ClimateEntity):
         self._attr_unique_id = f"{self._prefix}_thermostat"
 
         # add tags for thermostat to coordinator
-        coordinator.data.add_var(f"{self._prefix}_active")
-        coordinator.data.add_var(f"{self._prefix}_output")
-        coordinator.data.add_var(f"{self._prefix}_setpoint_lo")
-        coordinator.data.add_var(f"{self._prefix}_setpoint_hi")
-        coordinator.data.add_var(f"{self._prefix}_temperature")
-        coordinator.data.add_var(f"{self._prefix}_floor_tmp")
-        coordinator.data.add_var(f"{self._prefix}_humidity")
-        coordinator.data.add_var(f"{self._prefix}_setpoint")
-        coordinator.data.add_var(f"{self._prefix}_setpoint_idle")
-        coordinator.data.add_var(f"{self._prefix}_setpoint_offset")
-        coordinator.data.add_var(f"{self._prefix}_setpoint_active")
-        coordinator.data.add_var(f"{self._prefix}_fan_limit")
-        coordinator.data.add_var(f"{self._prefix}_fan_options")
-        coordinator.data.add_var(f"{self._nad}.hvac_mode")
+        self._tags = HiqThermostatTags(self._prefix)
+        self._tag_hvac_mode = intern(f"{self._nad}.hvac_mode")
+        for tag in self._tags:
+            coordinator.add_var(tag)
+        coordinator.add_var(self._tag_hvac_mode)
+
+        self._state = self._get_state()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Derive the thermostat state once per coordinator update."""
+        self._state = self._get_state()
+        super()._handle_coordinator_update()
+
+    def uses_tag(self, tag: str) -> bool:
+        """Return True if the state of the thermostat depends on a tag."""
+        return tag == self._tag_hvac_mode or tag in self._tags
+
+    @callback
+    def async_handle_tag_update(self) -> None:
+        """Derive the state again after some of its tags were read."""
+        self._state = self._get_state()
+        self.async_write_ha_state()
+
+    def _get_state(self) -> HiqThermostatState:
+        """Read all thermostat tags and derive the entity state."""
+        get_value = self.coordinator.get_value
+        mode = CYBRO_TO_HA_HVAC_MODE_MAP.get(
+            get_value(self._tag_hvac_mode, def_val=1), HVACMode.OFF
+        )
+        active = get_value(self._tags.active, def_val=0)
+        fan_options = get_value(self._tags.fan_options, 1.0, 0, 0)
+        setpoint_idle = get_value(self._tags.setpoint_idle, 0.1, 1)
+
+        if mode == HVACMode.HEAT:
+            hvac_modes = SUPPORT_MODES_HEAT
+            hvac_mode = CYBRO_TO_HA_HVAC_HEAT_MAP.get(active)
+            hvac_action = CYBRO_TO_HA_HVAC_ACTION_HEAT_MAP.get(
+                get_value(self._tags.output, def_val=0)
+            )
+        elif mode == HVACMode.COOL:
+            hvac_modes = SUPPORT_MODES_COOL
+            hvac_mode = CYBRO_TO_HA_HVAC_COOL_MAP.get(active)
+            hvac_action = CYBRO_TO_HA_HVAC_ACTION_COOL_MAP.get(
+                get_value(self._tags.output, def_val=0)
+            )
+        else:
+            hvac_modes = [HVACMode.OFF]
+            hvac_mode = HVACMode.OFF
+            hvac_action = HVACAction.OFF
+
+        # set supported presets
+        preset_modes = None
+        if mode != HVACMode.OFF:
+            preset_modes = SUPPORT_PRESET_MODES
+            # allow boost only if fan max is enabled on thermostat
+            if (fan_options >> 4 & 1) != 0:
+                preset_modes = SUPPORT_PRESET_MODES_ALL
+
+        if get_value(self._tags.fan_limit, 1.0, 0, 0) == 4:
+            preset_mode = PRESET_BOOST
+        elif active == 1:
+            preset_mode = PRESET_COMFORT
+        elif (setpoint_idle or 0) > 0:
+            preset_mode = PRESET_ECO
+        else:
+            preset_mode = PRESET_NONE
+
+        setpoint_active = get_value(self._tags.setpoint_active, 0.1, 1)
+        if setpoint_active:
+            target_temperature = setpoint_active
+        elif preset_mode in (PRESET_BOOST, PRESET_COMFORT):
+            target_temperature = get_value(self._tags.setpoint, 0.1, 1)
+        else:
+            target_temperature = setpoint_idle
+
+        humidity = get_value(self._tags.humidity, 1.0, 0)
+
+        attributes = {}
+        if floor_tmp := get_value(self._tags.floor_tmp, 0.1, 1) or None:
+            attributes[ATTR_FLOOR_TEMP] = floor_tmp
+        if setpoint_idle:
+            attributes[ATTR_SETPOINT_IDLE] = setpoint_idle
+        if setpoint_active:
+            attributes[ATTR_SETPOINT_ACTIVE] = setpoint_active
+        if setp_off := get_value(self._tags.setpoint_offset, 0.1, 1) or None:
+            attributes[ATTR_SETPOINT_OFFSET] = setp_off
+        if fan_options:
+            attributes[ATTR_FAN_OPTIONS] = fan_options
+
+        return HiqThermostatState(
+            mode=mode,
+            hvac_mode=hvac_mode,
+            hvac_modes=hvac_modes,
+            hvac_action=hvac_action,
+            preset_mode=preset_mode,
+            preset_modes=preset_modes,
+            target_temperature=target_temperature,
+            min_temp=get_value(self._tags.setpoint_lo, 0.1, 1, 0.0),
+            max_temp=get_value(self._tags.setpoint_hi, 0.1, 1, 40.0),
+            current_temperature=get_value(self._tags.temperature, 0.1, 1),
+            current_humidity=humidity if humidity and humidity > 0 else None,
+            attributes=attributes,
+        )
 
     @property
     def current_temperature(self) -> float | None:
         """Return the reported current temperature for the device."""
-        return self.coordinator.get_value(f"{self._prefix}_temperature", 0.1, 1)
+        return self._state.current_temperature
 
     @property
     def current_humidity(self) -> float | None:
         """Return the current humidity."""
-        if (
-            humidity := self.coordinator.get_value(f"{self._prefix}_humidity", 1.0, 0)
-        ) is None:
-            return None
-        if humidity > 0:
-            return humidity
-        return None
+        return self._state.current_humidity
 
     @property
     def hvac_action(self) -> HVACAction | None:
         """Return the hvac action."""
-        mode = CYBRO_TO_HA_HVAC_MODE_MAP[
-            self.coordinator.get_value(f"{self._nad}.hvac_mode", def_val=1)
-        ]
-        if mode == HVACMode.HEAT:
-            return CYBRO_TO_HA_HVAC_ACTION_HEAT_MAP[
-                self.coordinator.get_value(f"{self._prefix}_output", def_val=0)
-            ]
-        if mode == HVACMode.COOL:
-            return CYBRO_TO_HA_HVAC_ACTION_COOL_MAP[
-                self.coordinator.get_value(f"{self._prefix}_output", def_val=0)
-            ]
-        return HVACAction.OFF
+        return self._state.hvac_action
 
     @property
     def target_temperature(self) -> float | None:
         """Return the target temperature for the device."""
-        # update min / max to actual values from thermostat
-        self._attr_min_temp = self.coordinator.get_value(
-            f"{self._prefix}_setpoint_lo", 0.1, 1, 0.0
-        )
-        self._attr_max_temp = self.coordinator.get_value(
-            f"{self._prefix}_setpoint_hi", 0.1, 1, 40.0
-        )
-        if sp := self.coordinator.get_value(
-            f"{self._prefix}_setpoint_active", 0.1, 1, None
-        ):
-            return sp
-        if self.preset_mode in (PRESET_BOOST, PRESET_COMFORT):
-            return self.coordinator.get_value(f"{self._prefix}_setpoint", 0.1, 1)
-        return self.coordinator.get_value(f"{self._prefix}_setpoint_idle", 0.1, 1)
+        return self._state.target_temperature
+
+    @property
+    def min_temp(self) -> float:
+        """Return the minimum temperature of the thermostat."""
+        return self._state.min_temp
+
+    @property
+    def max_temp(self) -> float:
+        """Return the maximum temperature of the thermostat."""
+        return self._state.max_temp
 
     @property
     def hvac_mode(self) -> HVACMode | None:
         """Return the current HVAC mode for the device."""
-        mode = CYBRO_TO_HA_HVAC_MODE_MAP[
-            self.coordinator.get_value(f"{self._nad}.hvac_mode", def_val=1)
-        ]
-        if mode == HVACMode.HEAT:
-            self._attr_hvac_modes = SUPPORT_MODES_HEAT
-            return CYBRO_TO_HA_HVAC_HEAT_MAP[
-                self.coordinator.get_value(f"{self._prefix}_active", def_val=0)
-            ]
-        if mode == HVACMode.COOL:
-            self._attr_hvac_modes = SUPPORT_MODES_COOL
-            return CYBRO_TO_HA_HVAC_COOL_MAP[
-                self.coordinator.get_value(f"{self._prefix}_active", def_val=0)
-            ]
-        self._attr_hvac_modes = list(HVACMode.OFF)
-        HVACMode.OFF
+        return self._state.hvac_mode
+
+    @property
+    def hvac_modes(self) -> list[HVACMode]:
+        """Return the HVAC modes supported by the controller mode."""
+        return self._state.hvac_modes
 
     @property
     def preset_mode(self) -> str | None:
@@ -268,78 +384,21 @@ class HiqThermostat(HiqEntity, ClimateEntity):
 
         Requires ClimateEntityFeature.PRESET_MODE.
         """
-        # set supported presets
-        if (
-            CYBRO_TO_HA_HVAC_MODE_MAP[
-                self.coordinator.get_value(f"{self._nad}.hvac_mode", def_val=1)
-            ]
-            == HVACMode.OFF
-        ):
-            self._attr_preset_modes = None
-        else:
-            self._attr_preset_modes = SUPPORT_PRESET_MODES
-            # allow boost only if fan max is enabled on thermostat
-            if (
-                self.coordinator.get_value(f"{self._prefix}_fan_options", 1.0, 0, 0)
-                >> 4
-                & 1
-            ) != 0:
-                self._attr_preset_modes = SUPPORT_PRESET_MODES_ALL
-
-        if self.coordinator.get_value(f"{self._prefix}_fan_limit", 1.0, 0, 0) == 4:
-            return PRESET_BOOST
-        if self.coordinator.get_value(f"{self._prefix}_active", 1.0, 0, 0) == 1:
-            return PRESET_COMFORT
-        if self.coordinator.get_value(f"{self._prefix}_setpoint_idle", 0.1, 0, 0) > 0:
-            return PRESET_ECO
-        return PRESET_NONE
+        return self._state.preset_mode
+
+    @property
+    def preset_modes(self) -> list[str] | None:
+        """Return the preset modes supported by the thermostat."""
+        return self._state.preset_modes
 
     @property
     def extra_state_attributes(self):
         """Return the state attributes."""
-        data = {}
-        if (
-            floor_tmp := self.coordinator.get_value(f"{self._prefix}_floor_tmp", 0.1, 1)
-            or None
-        ):
-            data[ATTR_FLOOR_TEMP] = floor_tmp
-        if (
-            setp_idle := self.coordinator.get_value(
-                f"{self._prefix}_setpoint_idle", 0.1, 1
-            )
-            or None
-        ):
-            data[ATTR_SETPOINT_IDLE] = setp_idle
-        if (
-            setp_act := self.coordinator.get_value(
-                f"{self._prefix}_setpoint_active", 0.1, 1
-            )
-            or None
-        ):
-            data[ATTR_SETPOINT_ACTIVE] = setp_act
-        if (
-            setp_off := self.coordinator.get_value(
-                f"{self._prefix}_setpoint_offset", 0.1, 1
-            )
-            or None
-        ):
-            data[ATTR_SETPOINT_OFFSET] = setp_off
-        if (
-            fan_opts := self.coordinator.get_value(
-                f"{self._prefix}_fan_options", 1.0, 0, 0
-            )
-            or None
-        ):
-            data[ATTR_FAN_OPTIONS] = fan_opts
-        return data
+        return self._state.attributes
 
     async def async_set_hvac_mode(self, hvac_mode: HVACMode) -> None:
         """Set HVAC mode to device."""
-        if hvac_mode == HVACMode.OFF:
-            await self.coordinator.cybro.write_var(f"{self._prefix}_active", "0")
-        else:
-            await self.coordinator.cybro.write_var(f"{self._prefix}_active", "1")
-        await self.coordinator.async_refresh()
+        await self._async_write_zone(hvac_mode, {})
 
     async def async_turn_on(self) -> None:
         """Turn the climate on."""
@@ -355,34 +414,71 @@ class HiqThermostat(HiqEntity, ClimateEntity):
 
     async def async_set_preset_mode(self, preset_mode: str) -> None:
         """Set new preset mode."""
-        if preset_mode == PRESET_BOOST:
-            await self.coordinator.cybro.write_var(f"{self._prefix}_fan_limit", "4")
-        elif preset_mode == PRESET_COMFORT:
-            await self.coordinator.cybro.write_var(f"{self._prefix}_active", "1")
-        elif preset_mode == PRESET_ECO:
-            await self.coordinator.cybro.write_var(f"{self._prefix}_active", "0")
-        await self.coordinator.async_refresh()
+        await self._async_write_zone(None, {ATTR_PRESET_MODE: preset_mode})
 
     async def async_set_temperature(self, **kwargs: Any) -> None:
         """Set new target temperature."""
         if (temperature := kwargs.get(ATTR_TEMPERATURE)) is None:
             return
+        await self._async_write_zone(None, {ATTR_TEMPERATURE: temperature})
 
-        tags = {}
-        if self.preset_mode == PRESET_BOOST and self.hvac_mode == HVACMode.HEAT:
-            tags[f"{self._prefix}_setpoint_hi"] = int(temperature * 10.0)
-            if req := get_write_req_th(f"{self._prefix}_setpoint_hi", self._prefix):
-                tags[req] = "1"
-        elif self.preset_mode == PRESET_BOOST and self.hvac_mode == HVACMode.COOL:
-            tags[f"{self._prefix}_setpoint_lo"] = int(temperature * 10.0)
-            if req := get_write_req_th(f"{self._prefix}_setpoint_lo", self._prefix):
-                tags[req] = "1"
-        elif self.preset_mode == PRESET_ECO:
-            tags[f"{self._prefix}_setpoint_idle"] = int(temperature * 10.0)
-            if req := get_write_req_th(f"{self._prefix}_setpoint_idle", self._prefix):
-                tags[req] = "1"
-        else:
-            tags[f"{self._prefix}_setpoint"] = int(temperature * 10.0)
+    async def _async_write_zone(
+        self, state: str | None, attributes: dict[str, Any]
+    ) -> None:
+        """Write a new hvac mode, preset and / or setpoint."""
+        if (request := self.get_scene_write(state, attributes)) is not None:
+            await self.coordinator.async_write_many([request])
+
+    def get_scene_write(
+        self, state: str | None, attributes: dict[str, Any]
+    ) -> HiqWriteRequest | None:
+        """Return the writes for a hvac mode (active flag), preset and setpoint.
 
-        await self.coordinator.cybro.request(tags)
-        await self.coordinator.async_refresh()
+        Uses the state of the last update, nothing is read from the controller.
+        """
+        hvac_mode = self._state.hvac_mode
+        preset_mode = attributes.get(ATTR_PRESET_MODE, self._state.preset_mode)
+        tags: dict[str, str | int] = {}
+        write_reqs: dict[str, str] = {}
+
+        if state is not None:
+            if state == HVACMode.OFF:
+                tags[self._tags.active] = "0"
+            elif state in self._state.hvac_modes:
+                tags[self._tags.active] = "1"
+            else:
+                return None
+            hvac_mode = HVACMode(state)
+
+        if ATTR_PRESET_MODE in attributes:
+            # comfort / eco set the active flag as well (eco is off)
+            if state is not None and (
+                (preset_mode == PRESET_COMFORT and state == HVACMode.OFF)
+                or (preset_mode == PRESET_ECO and state != HVACMode.OFF)
+            ):
+                return None
+            if preset_mode == PRESET_BOOST:
+                tags[self._tags.fan_limit] = "4"
+            elif preset_mode == PRESET_COMFORT:
+                tags[self._tags.active] = "1"
+            elif preset_mode == PRESET_ECO:
+                tags[self._tags.active] = "0"
+            else:
+                return None
+
+        if (temperature := attributes.get(ATTR_TEMPERATURE)) is not None:
+            if preset_mode == PRESET_BOOST and hvac_mode == HVACMode.HEAT:
+                tag = self._tags.setpoint_hi
+            elif preset_mode == PRESET_BOOST and hvac_mode == HVACMode.COOL:
+                tag = self._tags.setpoint_lo
+            elif preset_mode == PRESET_ECO:
+                tag = self._tags.setpoint_idle
+            else:
+                tag = self._tags.setpoint
+            tags[tag] = int(float(temperature) * 10.0)
+            if req := get_write_req_th(tag, self._prefix):
+                write_reqs[req] = "1"
+
+        if not tags:
+            return None
+        return HiqWriteRequest({**tags, **write_reqs}, optimistic=tags)
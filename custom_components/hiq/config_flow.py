@@ -1,28 +1,39 @@
 """Config flow to configure the HIQ-Home integration."""
 from __future__ import annotations
 
+import csv
 import uuid
+from re import search
 from collections.abc import Mapping
+from io import StringIO
 from typing import Any
 
 import voluptuous as vol
 from cybro import Cybro
 from cybro import CybroConnectionError
 from cybro import Device
+from homeassistant.components.binary_sensor import DOMAIN as BINARY_SENSOR_DOMAIN
+from homeassistant.components.binary_sensor import BinarySensorDeviceClass
 from homeassistant.components.sensor import CONF_STATE_CLASS
 from homeassistant.components.sensor import DEVICE_CLASS_UNITS
 from homeassistant.components.sensor import DOMAIN as SENSOR_DOMAIN
 from homeassistant.components.sensor import SensorDeviceClass
 from homeassistant.components.sensor import SensorStateClass
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.config_entries import ConfigFlowResult
 from homeassistant.const import CONF_ADDRESS
 from homeassistant.const import CONF_DEVICE_CLASS
 from homeassistant.const import CONF_HOST
 from homeassistant.const import CONF_NAME
+from homeassistant.const import CONF_PLATFORM
 from homeassistant.const import CONF_PORT
+from homeassistant.const import CONF_SENSORS
 from homeassistant.const import CONF_UNIQUE_ID
 from homeassistant.const import CONF_UNIT_OF_MEASUREMENT
 from homeassistant.const import CONF_VALUE_TEMPLATE
 from homeassistant.core import async_get_hass
+from homeassistant.core import callback
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
@@ -31,6 +42,7 @@ from homeassistant.helpers.schema_config_entry_flow import SchemaConfigFlowHandl
 from homeassistant.helpers.schema_config_entry_flow import SchemaFlowError
 from homeassistant.helpers.schema_config_entry_flow import SchemaFlowFormStep
 from homeassistant.helpers.schema_config_entry_flow import SchemaFlowMenuStep
+from homeassistant.helpers.schema_config_entry_flow import SchemaOptionsFlowHandler
 from homeassistant.helpers.selector import NumberSelector
 from homeassistant.helpers.selector import NumberSelectorConfig
 from homeassistant.helpers.selector import NumberSelectorMode
@@ -41,14 +53,23 @@ from homeassistant.helpers.selector import TemplateSelector
 from homeassistant.helpers.selector import TextSelector
 from homeassistant.helpers.selector import TextSelectorConfig
 from homeassistant.helpers.selector import TextSelectorType
+from homeassistant.util.yaml import parse_yaml
 
 from . import COMBINED_SCHEMA
+from .catalog import get_page
+from .const import CATALOG_PAGE_SIZE
+from .const import CONF_EDGE_TAGS
 from .const import CONF_INDEX
+from .const import CONF_MODULE
+from .const import CONF_PAGE
+from .const import CONF_SEARCH
 from .const import CONF_TAG
 from .const import DEFAULT_HOST
 from .const import DEFAULT_PORT
 from .const import DOMAIN
+from .const import IMPORT_ERROR_ROWS
 from .const import LOGGER
+from .coordinator import HiqDataUpdateCoordinator
 
 PLC_SETUP = {
     vol.Required(CONF_HOST, default=DEFAULT_HOST): TextSelector(
@@ -63,26 +84,55 @@ PLC_SETUP = {
 }
 
 
-async def get_sensor_setup(handler: SchemaCommonFlowHandler) -> vol.Schema:
-    """Return sensor setup schema."""
+def _get_coordinator(handler: SchemaCommonFlowHandler) -> HiqDataUpdateCoordinator:
+    """Return the coordinator of the options flow entry."""
     hass = async_get_hass()
+    return hass.data[DOMAIN][handler.parent_handler.config_entry.entry_id]
 
-    coordinator = hass.data.get(DOMAIN)[handler.parent_handler.config_entry.entry_id]
-    var_prefix = f"c{handler.options.get(CONF_ADDRESS)}."
 
-    variables = list(coordinator.data.plc_info.plc_vars.keys())
-    # remove foreign variables and the prefix
-    variables = [
-        var.removeprefix(var_prefix) for var in variables if var.find(var_prefix) != -1
-    ]
+async def get_browse_tags_schema(handler: SchemaCommonFlowHandler) -> vol.Schema:
+    """Return schema to filter the variables of the controller."""
+    catalog = _get_coordinator(handler).catalog
+
+    return vol.Schema(
+        {
+            vol.Optional(CONF_MODULE): SelectSelector(
+                SelectSelectorConfig(
+                    options=list(catalog.modules),
+                    mode=SelectSelectorMode.DROPDOWN,
+                )
+            ),
+            vol.Optional(CONF_SEARCH): TextSelector(),
+            vol.Required(CONF_PAGE, default=1): NumberSelector(
+                NumberSelectorConfig(min=1, step=1, mode=NumberSelectorMode.BOX)
+            ),
+        }
+    )
+
 
+async def validate_browse_tags(
+    handler: SchemaCommonFlowHandler, user_input: dict[str, Any]
+) -> dict[str, Any]:
+    """Store the variable filter in flow state."""
+    tags = _get_coordinator(handler).catalog.search(
+        user_input.get(CONF_MODULE), user_input.get(CONF_SEARCH)
+    )
+    if not tags:
+        raise SchemaFlowError("no_tags_found")
+    handler.flow_state["_tags"] = get_page(
+        tags, int(user_input[CONF_PAGE]), CATALOG_PAGE_SIZE
+    )
+    return {}
+
+
+async def get_sensor_setup(handler: SchemaCommonFlowHandler) -> vol.Schema:
+    """Return sensor setup schema with the filtered variables."""
     return vol.Schema(
         {
             vol.Required(CONF_TAG): SelectSelector(
                 SelectSelectorConfig(
-                    options=variables,
+                    options=handler.flow_state["_tags"],
                     mode=SelectSelectorMode.DROPDOWN,
-                    sort=True,
                 )
             ),
             **SENSOR_SETUP,
@@ -131,6 +181,54 @@ SENSOR_SETUP = {
 
 DATA_SCHEMA_PLC = vol.Schema(PLC_SETUP)
 
+DATA_SCHEMA_IMPORT_SENSORS = vol.Schema(
+    {
+        vol.Required(CONF_SENSORS): TextSelector(
+            TextSelectorConfig(type=TextSelectorType.TEXT, multiline=True)
+        ),
+    }
+)
+
+IMPORT_PLATFORM_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONF_PLATFORM, default=SENSOR_DOMAIN): vol.In(
+            [SENSOR_DOMAIN, BINARY_SENSOR_DOMAIN]
+        ),
+    },
+    extra=vol.ALLOW_EXTRA,
+)
+
+IMPORT_SENSOR_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONF_PLATFORM): cv.string,
+        vol.Required(CONF_TAG): cv.string,
+        vol.Optional(CONF_NAME): cv.string,
+        vol.Optional(CONF_VALUE_TEMPLATE): cv.string,
+        vol.Optional(CONF_DEVICE_CLASS): vol.In(
+            [cls.value for cls in SensorDeviceClass]
+        ),
+        vol.Optional(CONF_STATE_CLASS): vol.In([cls.value for cls in SensorStateClass]),
+        vol.Optional(CONF_UNIT_OF_MEASUREMENT): cv.string,
+    }
+)
+
+IMPORT_BINARY_SENSOR_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONF_PLATFORM): cv.string,
+        vol.Required(CONF_TAG): cv.string,
+        vol.Optional(CONF_NAME): cv.string,
+        vol.Optional(CONF_VALUE_TEMPLATE): cv.string,
+        vol.Optional(CONF_DEVICE_CLASS): vol.In(
+            [cls.value for cls in BinarySensorDeviceClass]
+        ),
+    }
+)
+
+IMPORT_SCHEMAS = {
+    SENSOR_DOMAIN: IMPORT_SENSOR_SCHEMA,
+    BINARY_SENSOR_DOMAIN: IMPORT_BINARY_SENSOR_SCHEMA,
+}
+
 DATA_SCHEMA_EDIT_SENSOR = vol.Schema(SENSOR_SETUP)
 DATA_SCHEMA_SENSOR = vol.Schema(
     {
@@ -212,6 +310,29 @@ async def validate_sensor_setup(
     return {}
 
 
+async def get_edge_capture_schema(handler: SchemaCommonFlowHandler) -> vol.Schema:
+    """Return schema for the edge capture tags."""
+    # binary inputs / outputs and error flags, other tags can be entered
+    variables = [
+        var
+        for var in _get_coordinator(handler).catalog.tags
+        if search(r"_(ix|qx)\d+$|_output$|_error$|scan_overrun|retentive_fail", var)
+    ]
+
+    return vol.Schema(
+        {
+            vol.Optional(CONF_EDGE_TAGS, default=[]): SelectSelector(
+                SelectSelectorConfig(
+                    options=variables,
+                    multiple=True,
+                    custom_value=True,
+                    mode=SelectSelectorMode.DROPDOWN,
+                )
+            ),
+        }
+    )
+
+
 async def validate_select_sensor(
     handler: SchemaCommonFlowHandler, user_input: dict[str, Any]
 ) -> dict[str, Any]:
@@ -220,6 +341,78 @@ async def validate_select_sensor(
     return {}
 
 
+def _parse_sensor_list(text: str) -> list[dict[str, Any]]:
+    """Parse a YAML list or a CSV table (with header row) of sensors."""
+    try:
+        sensors = parse_yaml(text)
+    except HomeAssistantError:
+        sensors = None
+    if not isinstance(sensors, list):
+        sensors = list(csv.DictReader(StringIO(text.strip())))
+    # drop empty CSV cells
+    return [
+        {
+            str(key).strip(): value.strip() if isinstance(value, str) else value
+            for key, value in sensor.items()
+            if key is not None and value not in (None, "")
+        }
+        if isinstance(sensor, dict)
+        else sensor
+        for sensor in sensors
+    ]
+
+
+async def validate_import_sensors(
+    handler: SchemaCommonFlowHandler, user_input: dict[str, Any]
+) -> dict[str, Any]:
+    """Validate all imported sensors against the variable catalog in one pass."""
+    catalog = _get_coordinator(handler).catalog
+    configured = {
+        platform: {sensor[CONF_TAG] for sensor in handler.options.get(platform, [])}
+        for platform in IMPORT_SCHEMAS
+    }
+
+    new_sensors: dict[str, list[dict[str, Any]]] = {}
+    errors: list[str] = []
+    for row, sensor in enumerate(_parse_sensor_list(user_input[CONF_SENSORS]), 1):
+        try:
+            platform = IMPORT_PLATFORM_SCHEMA(sensor)[CONF_PLATFORM]
+            sensor = IMPORT_SCHEMAS[platform](sensor)
+        except vol.Invalid as error:
+            errors.append(f"{row}: {error}")
+            continue
+        tag = sensor[CONF_TAG].removeprefix(catalog.prefix)
+        if tag not in catalog:
+            errors.append(f"{row}: unknown tag {tag}")
+            continue
+        if tag in configured[platform]:
+            LOGGER.debug("import sensors: %s %s already configured", platform, tag)
+            continue
+        configured[platform].add(tag)
+        sensor.pop(CONF_PLATFORM, None)
+        sensor[CONF_TAG] = tag
+        sensor.setdefault(CONF_NAME, tag)
+        sensor[CONF_UNIQUE_ID] = str(uuid.uuid1())
+        new_sensors.setdefault(platform, []).append(sensor)
+
+    if errors:
+        LOGGER.warning("import sensors: invalid rows:\n%s", "\n".join(errors))
+        # the first rows are shown in the form, all of them in the log
+        rows = errors[:IMPORT_ERROR_ROWS]
+        if len(errors) > IMPORT_ERROR_ROWS:
+            rows.append(f"... {len(errors) - IMPORT_ERROR_ROWS} more")
+        handler.parent_handler.invalid_rows = "\n".join(rows)
+        raise SchemaFlowError("invalid_sensors")
+    if not new_sensors:
+        raise SchemaFlowError("no_sensors")
+
+    # Standard behavior is to merge the result with the options.
+    # In this case, we want to add sub-items so we update the options directly.
+    for platform, sensors in new_sensors.items():
+        handler.options.setdefault(platform, []).extend(sensors)
+    return {}
+
+
 async def get_select_sensor_schema(handler: SchemaCommonFlowHandler) -> vol.Schema:
     """Return schema for selecting a sensor."""
     return vol.Schema(
@@ -270,8 +463,11 @@ async def get_remove_sensor_schema(handler: SchemaCommonFlowHandler) -> vol.Sche
         {
             vol.Required(CONF_INDEX): cv.multi_select(
                 {
-                    str(index): config[CONF_NAME]
-                    for index, config in enumerate(handler.options[SENSOR_DOMAIN])
+                    f"{platform}.{index}": config[CONF_NAME]
+                    if platform == SENSOR_DOMAIN
+                    else f"{config[CONF_NAME]} ({platform})"
+                    for platform in IMPORT_SCHEMAS
+                    for index, config in enumerate(handler.options.get(platform, []))
                 },
             )
         }
@@ -287,16 +483,19 @@ async def validate_remove_sensor(
     # Standard behavior is to merge the result with the options.
     # In this case, we want to remove sub-items so we update the options directly.
     entity_registry = er.async_get(handler.parent_handler.hass)
-    sensors: list[dict[str, Any]] = []
-    sensor: dict[str, Any]
-    for index, sensor in enumerate(handler.options[SENSOR_DOMAIN]):
-        if str(index) not in removed_indexes:
-            sensors.append(sensor)
-        elif entity_id := entity_registry.async_get_entity_id(
-            SENSOR_DOMAIN, DOMAIN, sensor[CONF_UNIQUE_ID]
-        ):
-            entity_registry.async_remove(entity_id)
-    handler.options[SENSOR_DOMAIN] = sensors
+    for platform in IMPORT_SCHEMAS:
+        if platform not in handler.options:
+            continue
+        sensors: list[dict[str, Any]] = []
+        sensor: dict[str, Any]
+        for index, sensor in enumerate(handler.options[platform]):
+            if f"{platform}.{index}" not in removed_indexes:
+                sensors.append(sensor)
+            elif entity_id := entity_registry.async_get_entity_id(
+                platform, DOMAIN, sensor[CONF_UNIQUE_ID]
+            ):
+                entity_registry.async_remove(entity_id)
+        handler.options[platform] = sensors
     return {}
 
 
@@ -308,12 +507,31 @@ CONFIG_FLOW = {
 }
 
 OPTIONS_FLOW = {
-    "init": SchemaFlowMenuStep(["add_sensor", "select_edit_sensor", "remove_sensor"]),
+    "init": SchemaFlowMenuStep(
+        [
+            "browse_tags",
+            "import_sensors",
+            "select_edit_sensor",
+            "remove_sensor",
+            "edge_capture",
+        ]
+    ),
+    "browse_tags": SchemaFlowFormStep(
+        get_browse_tags_schema,
+        suggested_values=None,
+        validate_user_input=validate_browse_tags,
+        next_step="add_sensor",
+    ),
     "add_sensor": SchemaFlowFormStep(
         get_sensor_setup,
         suggested_values=None,
         validate_user_input=validate_sensor_setup,
     ),
+    "import_sensors": SchemaFlowFormStep(
+        DATA_SCHEMA_IMPORT_SENSORS,
+        suggested_values=None,
+        validate_user_input=validate_import_sensors,
+    ),
     "select_edit_sensor": SchemaFlowFormStep(
         get_select_sensor_schema,
         suggested_values=None,
@@ -330,9 +548,23 @@ OPTIONS_FLOW = {
         suggested_values=None,
         validate_user_input=validate_remove_sensor,
     ),
+    "edge_capture": SchemaFlowFormStep(get_edge_capture_schema),
 }
 
 
+class HiqOptionsFlowHandler(SchemaOptionsFlowHandler):
+    """Handle the HIQ-Home options, with the failed rows of a sensor import."""
+
+    invalid_rows = ""
+
+    @callback
+    def async_show_form(self, **kwargs: Any) -> ConfigFlowResult:
+        """Show a form, pass the failed import rows to the error message."""
+        kwargs["description_placeholders"] = {"rows": self.invalid_rows}
+        self.invalid_rows = ""
+        return super().async_show_form(**kwargs)
+
+
 class HiqFlowHandler(SchemaConfigFlowHandler, domain=DOMAIN):
     """Handle a HIQ-Home config flow."""
 
@@ -344,3 +576,18 @@ class HiqFlowHandler(SchemaConfigFlowHandler, domain=DOMAIN):
     def async_config_entry_title(self, options: Mapping[str, Any]) -> str:
         """Return config entry title."""
         return f"c{options[CONF_ADDRESS]}@{options[CONF_HOST]}:{options[CONF_PORT]}"
+
+
+@callback
+def _async_get_options_flow(config_entry: ConfigEntry) -> HiqOptionsFlowHandler:
+    """Get the options flow of a HIQ-Home config entry."""
+    return HiqOptionsFlowHandler(
+        config_entry,
+        OPTIONS_FLOW,
+        HiqFlowHandler.async_options_flow_finished,
+        HiqFlowHandler.async_setup_preview,
+    )
+
+
+# set after the class, SchemaConfigFlowHandler replaces it on subclassing
+HiqFlowHandler.async_get_options_flow = staticmethod(_async_get_options_flow)
@@ -16,6 +16,48 @@ DEVICE_SW_VERSION = "0.3.3"
 LOGGER = logging.getLogger(__package__)
 SCAN_INTERVAL = timedelta(seconds=10)
 SCAN_INTERVAL_ADDON = timedelta(seconds=5)
+# number of polls a blind may still be moving towards an optimistic position
+OPTIMISTIC_COVER_READS = 6
+# blind motion model: default travel time 0..100 % [s] and learn rate
+COVER_TRAVEL_TIME = 60.0
+COVER_TRAVEL_LEARN_RATE = 0.3
+# state update interval of a moving blind and reads every n-th tick
+COVER_MOTION_TICK = timedelta(seconds=1)
+COVER_FAST_POLL_TICKS = 2
+# consecutive failed fast reads after which the motion tracking stops
+COVER_FAST_READ_FAILURES = 3
+# minimum time between two brightness writes of a light transition [s]
+TRANSITION_MIN_INTERVAL = 0.5
+# thermostat config writes within this time [s] are merged into one commit
+CONFIG_WRITE_DELAY = 0.3
+# no energy is integrated between power samples further apart
+ENERGY_MAX_SAMPLE_GAP = timedelta(minutes=5)
+# voltage scaling: raw values above the limit are in 0.1 V, values between the
+# minimum and the limit in V. A factor is settled after a window of samples.
+VOLTAGE_SCALE_MIN = 100.0
+VOLTAGE_SCALE_LIMIT = 300.0
+VOLTAGE_SCALE_WINDOW = 12
+VOLTAGE_SCALE_SAVE_DELAY = 10
+STORAGE_VERSION = 1
+# delay to persist the outbox of queued writes and their maximum age [s],
+# older writes are dropped instead of replaying stale setpoints and outputs
+OUTBOX_SAVE_DELAY = 1
+OUTBOX_MAX_AGE = 900
+# circuit breaker per scgi server: consecutive connection errors to open,
+# first and longest backoff [s] until a probe request
+BREAKER_FAILURES = 3
+BREAKER_BACKOFF_BASE = 10
+BREAKER_BACKOFF_MAX = 300
+DATA_BREAKERS = f"{DOMAIN}_breakers"
+# chunk size to read scgi server responses and size [bytes] of a response
+# from which on the rest is parsed in the executor
+XML_CHUNK_SIZE = 16384
+XML_EXECUTOR_SIZE = 65536
+# windows of the weather history [s]
+WEATHER_HISTORY_WINDOW = 24 * 3600
+WEATHER_TENDENCY_WINDOW = 3 * 3600
+# sample interval of the edge capture tags
+EDGE_SAMPLE_INTERVAL = timedelta(milliseconds=500)
 
 DEFAULT_HOST = "85493909-cybroscgiserver"
 DEFAULT_PORT = 4000
@@ -37,6 +79,13 @@ ATTR_SETPOINT_ACTIVE = "Setpoint active"
 ATTR_SETPOINT_OFFSET = "Setpoint offset"
 ATTR_FAN_OPTIONS = "fan_options"
 ATTR_VARIABLE = "variable"
+ATTR_TRAVEL_TIME = "travel_time"
+ATTR_TEMPERATURE_MIN = "temperature_min_24h"
+ATTR_TEMPERATURE_MAX = "temperature_max_24h"
+ATTR_WIND_SPEED_MAX = "wind_speed_max_24h"
+ATTR_PRESSURE_TENDENCY = "pressure_tendency_3h"
+ATTR_FAILURES = "failures"
+ATTR_RETRY_IN = "retry_in"
 
 # Device classes
 DEVICE_CLASS_HIQ_LIVE_OVERRIDE: Final = "hiq__live_override"
@@ -49,7 +98,20 @@ SERVICE_HOME = "home_event"
 SERVICE_ALARM = "alarm_event"
 SERVICE_PRECEDE = "precede_event"
 SERVICE_WRITE_TAG = "write_tag"
+SERVICE_APPLY_SCENE = "apply_scene"
+SERVICE_SET_ZONES = "set_zones"
 
 # Schemas
 CONF_TAG = "tag"
 CONF_INDEX = "index"
+CONF_EDGE_TAGS = "edge_tags"
+CONF_MODULE = "module"
+CONF_SEARCH = "search"
+CONF_PAGE = "page"
+
+# number of variables shown per page in the options flow
+CATALOG_PAGE_SIZE = 100
+# number of failed rows of a sensor import shown in the options flow
+IMPORT_ERROR_ROWS = 5
+
+EVENT_EDGE = "hiq_edge"
@@ -1,10 +1,19 @@
 """DataUpdateCoordinator for HIQ-Home."""
 from __future__ import annotations
 
+import asyncio
 from collections.abc import Callable
+from math import ceil
+from math import inf
+from copy import deepcopy
+from dataclasses import dataclass
+from dataclasses import field
+from datetime import timedelta
+from functools import lru_cache
+from typing import Any
+from zlib import crc32
 
-from cybro import Cybro
-from cybro import CybroConnectionTimeoutError
+from cybro import CybroConnectionError
 from cybro import CybroError
 from cybro import Device as HiqDevice
 from homeassistant.config_entries import ConfigEntry
@@ -12,16 +21,97 @@ from homeassistant.const import CONF_ADDRESS
 from homeassistant.const import CONF_HOST
 from homeassistant.const import CONF_PORT
 from homeassistant.core import HomeAssistant
+from homeassistant.core import callback
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.template import Template
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 from homeassistant.helpers.update_coordinator import UpdateFailed
+from jinja2 import Environment
+from jinja2 import TemplateError
+from jinja2 import meta
+from jinja2 import nodes
 
+from .breaker import STATE_CLOSED
+from .breaker import STATE_HALF_OPEN
+from .breaker import async_get_breaker
+from .catalog import HiqTagCatalog
+from .client import HiqAlcFile
+from .client import HiqCybro
+from .const import CONFIG_WRITE_DELAY
 from .const import DEFAULT_HOST
 from .const import DOMAIN
 from .const import LOGGER
 from .const import SCAN_INTERVAL
 from .const import SCAN_INTERVAL_ADDON
+from .const import STORAGE_VERSION
+from .discovery import HiqDiscoveryPlan
+from .discovery import plan_discovery
+from .history import HiqTagHistory
+from .outbox import HiqOutbox
+from .values import HiqValueStore
+from .values import decode_value
+
+# jinja filters with a result which does not only depend on the input
+_IMPURE_JINJA_FILTERS = frozenset(("random",))
+# Home Assistant filters and tests which only depend on their input
+_PURE_FILTERS = frozenset(
+    (
+        "float", "int", "bool", "round", "multiply", "log", "sin", "cos",
+        "tan", "asin", "acos", "atan", "atan2", "sqrt", "is_number",
+        "bitwise_and", "bitwise_or", "bitwise_xor", "ord", "pack", "unpack",
+        "from_json", "to_json", "base64_encode", "base64_decode", "md5",
+        "sha1", "sha256", "sha512", "slugify", "iif", "regex_match",
+        "regex_search", "regex_replace", "regex_findall", "regex_findall_index",
+        "ordinal", "average", "median", "statistical_mode", "min", "max",
+        "timestamp_custom", "timestamp_local", "timestamp_utc", "as_datetime",
+        "contains", "match", "search",
+    )
+)  # fmt: skip
+# parses value templates to find out if they only depend on the value, the
+# templates are never rendered (filters and tests are only looked up by name)
+_JINJA_ENV = Environment(extensions=["jinja2.ext.loopcontrols", "jinja2.ext.do"])
+_JINJA_ENV.filters.update(dict.fromkeys(_PURE_FILTERS, str))
+_JINJA_ENV.tests.update(dict.fromkeys(_PURE_FILTERS, bool))
+
+
+@dataclass
+class HiqOptimisticValue:
+    """Value written to the controller which is not confirmed by a read yet."""
+
+    value: str
+    """expected raw value of the tag"""
+    reads_left: int = 0
+    """number of mismatching reads tolerated before the value is rolled back"""
+    written_at: float = -inf
+    """loop time of the write, reads started before do not count"""
+
+
+@dataclass
+class HiqWriteRequest:
+    """Tags to write for one entity and the state expected afterwards."""
+
+    tags: dict[str, str | int | float]
+    """tag / value pairs to write to the controller"""
+    optimistic: dict[str, str | int | float] | None = None
+    """expected tag values until the next read (Default: the written tags)"""
+    reads_left: int = 0
+    """number of mismatching reads tolerated before a rollback"""
+
+    @property
+    def expected(self) -> dict[str, str | int | float]:
+        """Return the tag values shown until the next read."""
+        return self.tags if self.optimistic is None else self.optimistic
+
+
+@dataclass
+class HiqConfigWrite:
+    """Pending config writes of one thermostat config group."""
+
+    done: asyncio.Future[None]
+    """result of the merged write, awaited by all writers of the group"""
+    tags: dict[str, str] = field(default_factory=dict)
+    """merged tag / value pairs (without the write request tag)"""
 
 
 class HiqDataUpdateCoordinator(DataUpdateCoordinator[HiqDevice]):
@@ -37,14 +127,49 @@ class HiqDataUpdateCoordinator(DataUpdateCoordinator[HiqDevice]):
         entry: ConfigEntry,
     ) -> None:
         """Initialize global HIQ-Home data updater."""
-        self.cybro = Cybro(
+        self.cybro = HiqCybro(
             entry.options[CONF_HOST],
             entry.options[CONF_PORT],
             entry.options[CONF_ADDRESS],
             session=async_get_clientsession(hass),
         )
+        self.cybro.executor = hass.async_add_executor_job
         self.unique_id = "c" + str(entry.options[CONF_ADDRESS])
         self.unsub: Callable | None = None
+        self._optimistic: dict[str, HiqOptimisticValue] = {}
+        # shared by all controllers on the same scgi server
+        self.breaker = async_get_breaker(
+            hass, entry.options[CONF_HOST], entry.options[CONF_PORT]
+        )
+        # allocation file of the last known program, see async_load_alc()
+        self._alc_store: Store[dict[str, str]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}.alc"
+        )
+        # writes which failed while the scgi server was unreachable
+        self.outbox = HiqOutbox(hass, entry)
+        # pending thermostat config writes by write request tag
+        self._config_writes: dict[str, HiqConfigWrite] = {}
+        # polled values, the cybro Var objects are dropped after each poll
+        self.values = HiqValueStore()
+        # start of the last stored poll and of later reads between the polls
+        # by tag, older results are not stored over fresher values
+        self._polled_at = -inf
+        self._read_at: dict[str, float] = {}
+        # value history of some tags, see track_history()
+        self.history: dict[str, HiqTagHistory] = {}
+        self._catalog: HiqTagCatalog | None = None
+        # variables grouped for the platforms, see async_plan_discovery()
+        self.discovery = HiqDiscoveryPlan()
+        self._catalog_vars: dict[str, str] | None = None
+        self._stored_alc: HiqAlcFile | None = None
+        # entities of this controller by entity id (filled when added to hass)
+        self.entities: dict[str, Any] = {}
+        # options the entry was set up with, to detect what changed
+        self.options: dict[str, Any] = deepcopy(dict(entry.options))
+        # custom entities of the options by platform (set by the platforms)
+        self.custom_entities: dict[str, Any] = {}
+        # last rendered value template result by (tag, template)
+        self._rendered: dict[tuple[str, str], tuple[str, Any]] = {}
 
         update_interval = SCAN_INTERVAL
         if entry.options[CONF_HOST] in (
@@ -54,6 +179,18 @@ class HiqDataUpdateCoordinator(DataUpdateCoordinator[HiqDevice]):
             "::1",
         ):
             update_interval = SCAN_INTERVAL_ADDON
+        # position of the polls within the interval (0..1), so the controllers
+        # on a server do not poll at the same time. Only the phase between the
+        # controllers is fixed, the origin of the loop time is arbitrary.
+        self.poll_phase = (
+            crc32(
+                f"{entry.options[CONF_HOST]}:{entry.options[CONF_PORT]}/"
+                f"{entry.options[CONF_ADDRESS]}".encode()
+            )
+            / 2**32
+        )
+        # the regular interval, update_interval is the time to the next poll
+        self._poll_interval = update_interval
 
         super().__init__(
             hass,
@@ -62,13 +199,45 @@ class HiqDataUpdateCoordinator(DataUpdateCoordinator[HiqDevice]):
             update_interval=update_interval,
         )
 
+    @callback
+    def _align_poll_phase(self) -> None:
+        """Set the update interval to the next poll at the phase of this controller.
+
+        The scheduler of the coordinator starts the interval at the full
+        second of the loop time, so the next poll is on the phase grid (plus
+        the constant sub second offset of the coordinator).
+        """
+        interval = self._poll_interval.total_seconds()
+        phase = self.poll_phase * interval
+        now = int(self.hass.loop.time())
+        # next point of the phase grid, at least half an interval from now
+        next_poll = ceil((now + interval / 2 - phase) / interval) * interval + phase
+        self.update_interval = timedelta(seconds=next_poll - now)
+
     async def _async_update_data(self) -> HiqDevice:
         """Fetch data from HIQ Controller."""
+        try:
+            return await self._async_poll()
+        finally:
+            # also after a failed poll, the next one follows this one
+            self._align_poll_phase()
+
+    async def _async_poll(self) -> HiqDevice:
+        """Poll the values of the HIQ controller."""
+        if not self.breaker.async_allow():
+            raise UpdateFailed(
+                f"Cybro scgi server {self.breaker.server} not reachable, "
+                f"next try in {self.breaker.retry_in:.0f} s"
+            )
+        if self.breaker.state == STATE_HALF_OPEN:
+            await self._async_probe()
+        started = self.hass.loop.time()
         try:
             device = await self.cybro.update(
                 full_update=not self.last_update_success, device_type=1
             )
-        except CybroConnectionTimeoutError as error:
+        except CybroConnectionError as error:
+            self.breaker.async_failure()
             raise UpdateFailed(
                 f"Could not connect to Cybro scgi server: {error}"
             ) from error
@@ -77,10 +246,330 @@ class HiqDataUpdateCoordinator(DataUpdateCoordinator[HiqDevice]):
                 f"Invalid response from Cybro scgi server: {error}"
             ) from error
 
-        self.async_update_listeners()
+        self.breaker.async_success()
+        if self.cybro.alc is not self._stored_alc:
+            self._async_save_alc()
+        # tags read between the polls after the poll started are fresher
+        self._read_at = {
+            tag: read_at for tag, read_at in self._read_at.items() if read_at > started
+        }
+        self._polled_at = started
+        self._store_values(device, set(self._read_at))
+        self._update_history()
+        await self._async_flush_outbox()
+        self._reconcile_optimistic(started=started)
 
         return device
 
+    async def async_load_alc(self) -> None:
+        """Load the allocation file of the last known program.
+
+        The allocation file is only downloaded again if the program on the
+        controller changed (by its timestamp).
+        """
+        if (data := await self._alc_store.async_load()) is not None:
+            self.cybro.alc = self._stored_alc = HiqAlcFile(**data)
+
+    @callback
+    def _async_save_alc(self) -> None:
+        """Store the allocation file of a new program."""
+        self._stored_alc = alc = self.cybro.alc
+        LOGGER.debug("%s: program of %s stored", self.unique_id, alc.timestamp)
+        self._alc_store.async_delay_save(
+            lambda: {"timestamp": alc.timestamp, "alc_file": alc.alc_file}
+        )
+
+    async def _async_probe(self) -> None:
+        """Send a cheap request to a scgi server which was not reachable."""
+        try:
+            await self.cybro.request({"sys.server_uptime": ""})
+        except CybroError as error:
+            self.breaker.async_failure()
+            raise UpdateFailed(
+                f"Cybro scgi server {self.breaker.server} still not reachable: {error}"
+            ) from error
+        except BaseException:
+            # cancelled probe, try again after the backoff
+            self.breaker.async_failure()
+            raise
+        self.breaker.async_success()
+
+    async def _async_flush_outbox(self) -> None:
+        """Send the writes queued during an outage in one request."""
+        try:
+            written = await self.outbox.async_flush(self.cybro)
+        except CybroConnectionError as error:
+            LOGGER.debug("outbox: write failed: %s", error)
+            self.breaker.async_failure()
+            return
+        except CybroError as error:
+            LOGGER.debug("outbox: write failed: %s", error)
+            return
+        now = self.hass.loop.time()
+        for tag in written:
+            # the values of this poll were read before the write
+            if (pending := self._optimistic.get(tag)) is not None:
+                pending.written_at = now
+
+    def _store_values(self, device: HiqDevice, skip: set[str] | None = None) -> None:
+        """Move the polled values (except older ones to skip) into the value store.
+
+        The polled user variables are removed from the device afterwards, so
+        their Var objects do not stay alive until the next poll.
+        """
+        changed = self.values.update(device.vars, skip)
+        LOGGER.debug("%s: %s of %s values changed", self.unique_id, changed, len(self.values))
+        for tag in device.user_vars:
+            device.vars.pop(tag, None)
+
+    @property
+    def polled_at(self) -> float:
+        """Return the loop time the last stored poll started at."""
+        return self._polled_at
+
+    @property
+    def catalog(self) -> HiqTagCatalog:
+        """Return the variable catalog, rebuilt only for a new alc file."""
+        plc_vars = self.data.plc_info.plc_vars
+        if self._catalog is None or self._catalog_vars is not plc_vars:
+            self._catalog = HiqTagCatalog(f"{self.unique_id}.", plc_vars)
+            self._catalog_vars = plc_vars
+        return self._catalog
+
+    async def async_plan_discovery(self) -> None:
+        """Group the variables for the discovery of the platforms.
+
+        Large programs have thousands of variables, the grouping runs in the
+        executor so only the entity setup is left on the event loop.
+        """
+        self.discovery = await self.hass.async_add_executor_job(
+            plan_discovery, f"{self.unique_id}.", self.data.plc_info.plc_vars
+        )
+        LOGGER.debug(
+            "%s: %s modules, %s thermostats discovered",
+            self.unique_id,
+            len(self.discovery.modules),
+            len(self.discovery.thermostats),
+        )
+
+    def add_var(self, tag: str, var_type: int = 0) -> None:
+        """Poll a tag for one more user (entity, statistics, edge capture)."""
+        self.values.use(tag)
+        self.data.add_var(tag, var_type=var_type)
+
+    def remove_var(self, tag: str) -> None:
+        """Release a tag of a removed user, stop polling it with the last one."""
+        if self.values.release(tag):
+            self.data.remove_var(tag)
+
+    def track_history(
+        self, tag: str, window: float, keep_samples: bool = False
+    ) -> HiqTagHistory:
+        """Keep the polled values of a tag within a time window [s]."""
+        if (history := self.history.get(tag)) is None:
+            history = self.history[tag] = HiqTagHistory(window, keep_samples)
+        return history
+
+    def _update_history(self) -> None:
+        """Add the polled values to the tracked histories."""
+        now = self.hass.loop.time()
+        for tag, history in self.history.items():
+            if (value := self.values.get_float(tag)) is not None:
+                history.add(now, value)
+
+    def _reconcile_optimistic(
+        self, tags: list[str] | None = None, started: float = inf
+    ) -> None:
+        """Confirm or roll back optimistic values against the polled values.
+
+        started: loop time the read started at, older than some writes
+        """
+        for tag, pending in list(self._optimistic.items()):
+            if tags is not None and tag not in tags:
+                continue
+            if tag in self.outbox.tags or started < pending.written_at:
+                # not written yet or read before the write
+                continue
+            actual = self.values.get_raw(tag)
+            if _is_same_value(actual, pending.value):
+                LOGGER.debug("optimistic: %s -> %s confirmed", tag, pending.value)
+                self._optimistic.pop(tag)
+            elif pending.reads_left > 0:
+                pending.reads_left -= 1
+            else:
+                LOGGER.debug(
+                    "optimistic: %s -> %s rolled back to %s", tag, pending.value, actual
+                )
+                self._optimistic.pop(tag)
+
+    async def async_write(
+        self,
+        tags: dict[str, str | int | float],
+        optimistic: dict[str, str | int | float] | None = None,
+        reads_left: int = 0,
+        refresh: bool = True,
+    ) -> None:
+        """Write tags in a single request and show the expected state at once.
+
+        tags: tag / value pairs to write to the controller
+        optimistic: expected tag values until the next read (Default: the written tags)
+        reads_left: number of mismatching reads tolerated before a rollback
+        refresh: read back the controller after the write
+        """
+        await self.async_write_many(
+            [HiqWriteRequest(tags, optimistic, reads_left)], refresh=refresh
+        )
+
+    async def async_write_many(
+        self, requests: list[HiqWriteRequest], refresh: bool = True
+    ) -> None:
+        """Write the tags of many entities in one request with one read back."""
+        tags: dict[str, str] = {}
+        expected: list[str] = []
+        for request in requests:
+            tags.update({tag: str(value) for tag, value in request.tags.items()})
+            self._set_optimistic(request.expected, request.reads_left)
+            expected.extend(request.expected)
+        if not tags:
+            return
+        self.async_update_listeners()
+
+        if self.breaker.state != STATE_CLOSED:
+            # keep the expected state, written after the next successful poll
+            LOGGER.debug("write queued: %s", tags)
+            self.outbox.async_add(tags)
+            return
+        LOGGER.debug("write values: %s", tags)
+        try:
+            await self.cybro.request(tags)
+        except CybroConnectionError as error:
+            LOGGER.warning("Write queued, scgi server not reachable: %s", error)
+            self.breaker.async_failure()
+            self.outbox.async_add(tags)
+            return
+        except CybroError:
+            for tag in expected:
+                self._optimistic.pop(tag, None)
+            self.async_update_listeners()
+            raise
+
+        if refresh:
+            await self.async_refresh()
+
+    async def async_write_config(
+        self, write_req: str, tags: dict[str, str | int | float]
+    ) -> None:
+        """Write thermostat config tags, merged with the pending writes of the group.
+
+        All tags of a config group written within CONFIG_WRITE_DELAY are sent
+        in one request with a single write request pulse (one config commit on
+        the thermostat) and read back once.
+        """
+        if (pending := self._config_writes.get(write_req)) is None:
+            pending = self._config_writes[write_req] = HiqConfigWrite(
+                self.hass.loop.create_future()
+            )
+            self.config_entry.async_create_background_task(
+                self.hass,
+                self._async_flush_config(write_req, pending),
+                name=f"{self.name} - {self.config_entry.title} - {write_req}",
+            )
+        pending.tags.update({tag: str(value) for tag, value in tags.items()})
+        self._set_optimistic(tags)
+        self.async_update_listeners()
+        await pending.done
+
+    async def _async_flush_config(
+        self, write_req: str, pending: HiqConfigWrite
+    ) -> None:
+        """Send the merged writes of a config group after the merge delay.
+
+        The result is always passed to the writers of the group, a cancelled
+        flush (unload, stop) cancels their write.
+        """
+        try:
+            await asyncio.sleep(CONFIG_WRITE_DELAY)
+            self._config_writes.pop(write_req, None)
+            LOGGER.debug("write config: %s (+%s)", pending.tags, write_req)
+            await self.async_write_many(
+                [
+                    HiqWriteRequest(
+                        {**pending.tags, write_req: "1"}, optimistic=pending.tags
+                    )
+                ]
+            )
+        except asyncio.CancelledError:
+            pending.done.cancel()
+            raise
+        except BaseException as error:
+            if not pending.done.done():
+                pending.done.set_exception(error)
+            if not isinstance(error, Exception):
+                raise
+        else:
+            if not pending.done.done():
+                pending.done.set_result(None)
+        finally:
+            if self._config_writes.get(write_req) is pending:
+                del self._config_writes[write_req]
+            if not pending.done.done():
+                pending.done.cancel()
+
+    async def async_shutdown(self) -> None:
+        """Cancel any scheduled call and fail the pending config writes."""
+        await super().async_shutdown()
+        while self._config_writes:
+            write_req, pending = self._config_writes.popitem()
+            if not pending.done.done():
+                LOGGER.debug("write config: %s dropped on unload", write_req)
+                pending.done.set_exception(
+                    CybroError(f"{self.unique_id} unloaded before the config write")
+                )
+
+    def _set_optimistic(
+        self, tags: dict[str, str | int | float], reads_left: int = 0
+    ) -> None:
+        """Show written tag values until they are confirmed by a read."""
+        now = self.hass.loop.time()
+        for tag, value in tags.items():
+            self._optimistic[tag] = HiqOptimisticValue(str(value), reads_left, now)
+
+    async def async_read(self, tags: list[str]) -> None:
+        """Read some tags in between the regular polls.
+
+        Listeners are not notified, the caller updates its own state.
+        """
+        if self.breaker.state != STATE_CLOSED:
+            raise CybroConnectionError(
+                f"Cybro scgi server {self.breaker.server} not reachable"
+            )
+        started = self.hass.loop.time()
+        try:
+            data = await self.cybro.request({tag: "" for tag in tags})
+        except CybroConnectionError:
+            self.breaker.async_failure()
+            raise
+        self.data.update_user_var_from_dict(data)
+        if started < self._polled_at:
+            # a poll which started later stored fresher values
+            self._store_values(self.data, set(tags))
+        else:
+            self._read_at.update(dict.fromkeys(tags, started))
+            self._store_values(self.data)
+        self._reconcile_optimistic(tags, started)
+
+    def get_raw_value(self, tag: str) -> str | None:
+        """Return the raw value of a tag, preferring a pending optimistic value."""
+        if (pending := self._optimistic.get(tag)) is not None:
+            return pending.value
+        return self.values.get_raw(tag)
+
+    def get_description(self, tag: str, def_val: str = "?") -> str:
+        """Return the description of a tag."""
+        if (desc := self.values.get_description(tag)) is None:
+            return def_val
+        return desc
+
     def get_value(
         self,
         tag: str,
@@ -89,31 +578,14 @@ class HiqDataUpdateCoordinator(DataUpdateCoordinator[HiqDevice]):
         def_val: str | int | float | None = None,
     ) -> str | int | float | None:
         """Return a single Tag Value and format it with a specific factor."""
-        res = self.data.vars.get(tag, None)
-        if res is None:
-            return def_val
-        if res.value == "?" or res.value is None:
-            LOGGER.debug("get_value: %s -> ? (%s)", str(tag), str(def_val))
+        if (pending := self._optimistic.get(tag)) is not None:
+            if pending.value == "?":
+                return def_val
+            return decode_value(pending.value, factor, precision)
+        if (value := self.values.get_decoded(tag, factor, precision)) is None:
+            LOGGER.debug("get_value: %s -> ? (%s)", tag, def_val)
             return def_val
-        try:
-            if precision is None:
-                LOGGER.debug("get_value: %s -> %s", str(tag), str(res.value))
-                return res.value
-            # try to parse float value, if fails, try to return int, else return as string
-            if factor != 1.0 or precision != 0 or res.value in (",", "."):
-                converted_numerical_value = float(res.value.replace(",", "")) * factor
-                value = f"{converted_numerical_value:z.{precision}f}"
-                LOGGER.debug(
-                    "get_value: %s -> %s",
-                    str(tag),
-                    str(value),
-                )
-                return float(value)
-            LOGGER.debug("get_value: %s -> %s", str(tag), str(res.value))
-            return int(res.value)
-        except ValueError:
-            LOGGER.debug("get_value: %s -> %s", str(tag), str(res.value))
-            return res.value
+        return value
 
     def get_template_value(
         self,
@@ -121,15 +593,61 @@ class HiqDataUpdateCoordinator(DataUpdateCoordinator[HiqDevice]):
         value_template: Template | None = None,
         def_val: bool | str | int | float | None = None,
     ) -> bool | str | int | float | None:
-        """Return a single Tag Value and format it with a given template."""
-        res = self.data.vars.get(tag, None)
-        if res is None:
-            return def_val
-        if res.value == "?" or res.value is None:
-            LOGGER.debug("get_template_value: %s -> ? (%s)", str(tag), str(def_val))
+        """Return a single Tag Value and format it with a given template.
+
+        Templates which only depend on the value are only rendered again when
+        the raw value changed, the result is shared by all entities with the
+        same tag and template. Other templates (states(), now(), ...) are
+        rendered on every access.
+        """
+        value = self.get_raw_value(tag)
+        if value == "?" or value is None:
+            LOGGER.debug("get_template_value: %s -> ? (%s)", tag, def_val)
             return def_val
-        value = res.value
-        if (template := value_template) is not None:
-            value = template.async_render_with_possible_json_value(value, None)
-        LOGGER.debug("get_template_value: %s -> %s", str(tag), str(value))
-        return value
+        if (template := value_template) is None:
+            return value
+        key = (tag, template.template)
+        if (rendered := self._rendered.get(key)) is not None and rendered[0] == value:
+            return rendered[1]
+        result = template.async_render_with_possible_json_value(value, None)
+        LOGGER.debug("get_template_value: %s %s -> %s", tag, value, result)
+        if is_value_template(template.template):
+            self._rendered[key] = (value, result)
+        return result
+
+    @callback
+    def forget_rendered(self, tag: str) -> None:
+        """Drop the rendered template results of a tag (entity removed)."""
+        for key in [key for key in self._rendered if key[0] == tag]:
+            del self._rendered[key]
+
+
+@lru_cache(maxsize=256)
+def is_value_template(source: str) -> bool:
+    """Return True if a template only depends on value / value_json."""
+    try:
+        ast = _JINJA_ENV.parse(source)
+        if any(ast.find_all((nodes.Import, nodes.FromImport, nodes.Include))):
+            return False
+        if any(
+            node.name in _IMPURE_JINJA_FILTERS for node in ast.find_all(nodes.Filter)
+        ):
+            return False
+        # unknown filters and tests (states, is_state, ...) fail here
+        variables = meta.find_undeclared_variables(ast)
+    except TemplateError:
+        return False
+    # other entities, the time, ...
+    return variables <= {"value", "value_json"}
+
+
+def _is_same_value(actual: str | None, expected: str) -> bool:
+    """Compare a polled value with a written one (numbers by value)."""
+    if actual is None:
+        return False
+    if actual == expected:
+        return True
+    try:
+        return float(actual.replace(",", "")) == float(expected.replace(",", ""))
+    except ValueError:
+        return False
@@ -1,23 +1,39 @@
 """Support for HIQ-Home blinds."""
 from __future__ import annotations
 
+from collections.abc import Callable
+from contextlib import suppress
 from dataclasses import dataclass
+from datetime import datetime
 from re import sub
+from sys import intern
 from typing import Any
 
+from cybro import CybroError
+from homeassistant.components.cover import ATTR_CURRENT_POSITION
 from homeassistant.components.cover import ATTR_POSITION
 from homeassistant.components.cover import CoverDeviceClass
 from homeassistant.components.cover import CoverEntity
 from homeassistant.components.cover import CoverEntityDescription
 from homeassistant.components.cover import CoverEntityFeature
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import STATE_CLOSED
+from homeassistant.const import STATE_OPEN
 from homeassistant.core import HomeAssistant
+from homeassistant.core import callback
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_track_time_interval
 
 from .const import AREA_BLINDS
 from .const import ATTR_DESCRIPTION
+from .const import ATTR_TRAVEL_TIME
 from .const import ATTR_VARIABLE
+from .const import COVER_FAST_POLL_TICKS
+from .const import COVER_FAST_READ_FAILURES
+from .const import COVER_MOTION_TICK
+from .const import COVER_TRAVEL_LEARN_RATE
+from .const import COVER_TRAVEL_TIME
 from .const import DEVICE_DESCRIPTION
 from .const import DEVICE_HW_VERSION
 from .const import DEVICE_SW_VERSION
@@ -25,7 +41,9 @@ from .const import DOMAIN
 from .const import LOGGER
 from .const import MANUFACTURER
 from .const import MANUFACTURER_URL
+from .const import OPTIMISTIC_COVER_READS
 from .coordinator import HiqDataUpdateCoordinator
+from .coordinator import HiqWriteRequest
 from .light import is_general_error_ok
 from .models import HiqEntity
 
@@ -65,7 +83,7 @@ def find_blinds(
     eg: c1000.bc00_blinds_position_00 and so on.
     """
     res: list[HiqUpdateCover] = []
-    for key in coordinator.data.plc_info.plc_vars:
+    for key in coordinator.discovery.keys("bc"):
         if key.find(".bc") != -1 and key.find("_blinds_position") != -1:
             if is_general_error_ok(coordinator, key):
                 dev_info = DeviceInfo(
@@ -124,6 +142,66 @@ def _get_blind_var(
     return ""
 
 
+@dataclass
+class HiqBlindMotion:
+    """Motion model of a blind, learns the travel time from observed moves.
+
+    Positions are controller positions (0 = open, 100 = closed).
+    """
+
+    travel_time: float = COVER_TRAVEL_TIME
+    """learned time for a full travel (0..100) [s]"""
+    position: float | None = None
+    """position at the last read"""
+    direction: int = 0
+    """1 = closing, -1 = opening, 0 = stopped (at the last read)"""
+    timestamp: float = 0.0
+    """monotonic time of the last read"""
+    target: float | None = None
+    """position the blind was sent to"""
+
+    def observe(self, position: float | None, direction: int, now: float) -> None:
+        """Add a read of position and motor outputs to the model."""
+        if (
+            position is not None
+            and self.position is not None
+            and direction != 0
+            and direction == self.direction
+        ):
+            moved = (position - self.position) * direction
+            elapsed = now - self.timestamp
+            if moved > 0 and elapsed > 0:
+                travel_time = min(max(100.0 * elapsed / moved, 5.0), 600.0)
+                self.travel_time += (
+                    travel_time - self.travel_time
+                ) * COVER_TRAVEL_LEARN_RATE
+        self.position = position
+        self.direction = direction
+        self.timestamp = now
+        if direction == 0:
+            self.target = None
+
+    def predict(self, now: float) -> float | None:
+        """Return the interpolated position of a moving blind."""
+        if self.position is None or self.direction == 0:
+            return self.position
+        position = (
+            self.position
+            + self.direction * (now - self.timestamp) * 100.0 / self.travel_time
+        )
+        if self.direction > 0:
+            return min(position, 100.0 if self.target is None else self.target)
+        return max(position, 0.0 if self.target is None else self.target)
+
+    def arrived(self, now: float) -> bool:
+        """Return True if a moving blind should have reached its end position."""
+        if self.position is None or self.direction == 0:
+            return False
+        if (end := self.target) is None:
+            end = 100.0 if self.direction > 0 else 0.0
+        return self.predict(now) == end
+
+
 class HiqUpdateCover(HiqEntity, CoverEntity):
     """Defines a Single HIQ-Home Blind."""
 
@@ -144,44 +222,54 @@ class HiqUpdateCover(HiqEntity, CoverEntity):
         """Initialize HIQ-Home blind."""
         super().__init__(coordinator=coordinator)
         self.entity_description = entity_description
-        self._attr_unique_id = unique_id or entity_description.key
+        self._attr_unique_id = intern(unique_id or entity_description.key)
         self._attr_device_info = dev_info
-        self._setpoint_var = var_setpoint_name
-        self._moving_up_var = var_up_name
-        self._moving_dn_var = var_down_name
+        self._setpoint_var = intern(var_setpoint_name)
+        self._moving_up_var = intern(var_up_name)
+        self._moving_dn_var = intern(var_down_name)
         LOGGER.debug(self._attr_unique_id)
-        coordinator.data.add_var(self._attr_unique_id, var_type=0)
+        coordinator.add_var(self._attr_unique_id, var_type=0)
         if self._moving_dn_var != "":
-            coordinator.data.add_var(self._moving_dn_var, var_type=0)
+            coordinator.add_var(self._moving_dn_var, var_type=0)
         if self._moving_up_var != "":
-            coordinator.data.add_var(self._moving_up_var, var_type=0)
+            coordinator.add_var(self._moving_up_var, var_type=0)
+        self._motion = HiqBlindMotion()
+        self._motion_tags = [
+            tag
+            for tag in (self._attr_unique_id, self._moving_up_var, self._moving_dn_var)
+            if tag != ""
+        ]
+        self._motion_ticks = 0
+        self._motion_failures = 0
+        self._motion_reading = False
+        self._unsub_motion: Callable | None = None
 
     @property
     def is_closed(self) -> bool | None:
         """Return true if the cover is closed or None if the status is unknown."""
-        res = self.coordinator.data.vars.get(self._attr_unique_id, None)
+        res = self.coordinator.get_raw_value(self._attr_unique_id)
         if res is None or res == "?":
             return None
-        return bool(res.value == "100")
+        return bool(res == "100")
 
     @property
     def is_opening(self) -> bool:
         """Return true if the cover is actively opening."""
         if self._moving_up_var != "":
-            res = self.coordinator.data.vars.get(self._moving_up_var, None)
+            res = self.coordinator.get_raw_value(self._moving_up_var)
             if res is None or res == "?":
                 return False
-            return bool(res.value == "1")
+            return bool(res == "1")
         return False
 
     @property
     def is_closing(self) -> bool:
         """Return true if the cover is actively closing."""
         if self._moving_dn_var != "":
-            res = self.coordinator.data.vars.get(self._moving_dn_var, None)
+            res = self.coordinator.get_raw_value(self._moving_dn_var)
             if res is None or res == "?":
                 return False
-            return bool(res.value == "1")
+            return bool(res == "1")
         return False
 
     @property
@@ -190,6 +278,8 @@ class HiqUpdateCover(HiqEntity, CoverEntity):
 
         None is unknown, 0 is closed, 100 is fully open.
         """
+        if (position := self._motion.predict(self.hass.loop.time())) is not None:
+            return int(100 - round(position))
         res = self.coordinator.get_value(self._attr_unique_id)
         if res is None:
             return None
@@ -217,34 +307,143 @@ class HiqUpdateCover(HiqEntity, CoverEntity):
 
     async def async_open_cover(self, **kwargs: Any) -> None:
         """Move the cover up."""
-        if self._setpoint_var != "":
-            await self.coordinator.cybro.write_var(self._setpoint_var, "0")
+        await self._async_move_to(0)
 
     async def async_close_cover(self, **kwargs: Any) -> None:
         """Move the cover down."""
-        if self._setpoint_var != "":
-            await self.coordinator.cybro.write_var(self._setpoint_var, "100")
+        await self._async_move_to(100)
 
     async def async_stop_cover(self, **kwargs: Any) -> None:
         """Stop the cover."""
+        self._motion.target = None
         if self._setpoint_var != "":
-            await self.coordinator.cybro.write_var(self._setpoint_var, "-1")
+            await self.coordinator.async_write({self._setpoint_var: "-1"}, optimistic={})
 
     async def async_set_cover_position(self, **kwargs: Any) -> None:
         """Move the cover to a specific position."""
         position = kwargs[ATTR_POSITION]
-        if self._setpoint_var != "":
-            pos = 100 - int(position)
-            await self.coordinator.cybro.write_var(self._setpoint_var, str(pos))
+        await self._async_move_to(100 - int(position))
+
+    async def _async_move_to(self, pos: int) -> None:
+        """Write a new blind setpoint and expect the position to follow it."""
+        if (request := self._get_move_write(pos)) is not None:
+            await self.coordinator.async_write_many([request])
+
+    def _get_move_write(self, pos: int) -> HiqWriteRequest | None:
+        """Return the writes to move the blind to a position (0 = open)."""
+        if self._setpoint_var == "":
+            return None
+        current = self._motion.position
+        if self._moving_up_var == "" or self._moving_dn_var == "" or current is None:
+            # no motor outputs, expect the position itself
+            return HiqWriteRequest(
+                {self._setpoint_var: str(pos)},
+                optimistic={self._attr_unique_id: str(pos)},
+                reads_left=OPTIMISTIC_COVER_READS,
+            )
+        # expect the motor to start, the motion model moves the position. The
+        # first read after the write shows if it did (or stopped already)
+        self._motion.target = pos
+        return HiqWriteRequest(
+            {self._setpoint_var: str(pos)},
+            optimistic={
+                self._moving_up_var: "1" if pos < current else "0",
+                self._moving_dn_var: "1" if pos > current else "0",
+            },
+        )
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Stop the motion tracking."""
+        self._async_stop_motion()
+        await super().async_will_remove_from_hass()
+
+    def uses_tag(self, tag: str) -> bool:
+        """Return True if the state of the blind depends on a tag."""
+        return tag in (
+            self._attr_unique_id,
+            self._setpoint_var,
+            self._moving_up_var,
+            self._moving_dn_var,
+        )
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated data from the coordinator."""
+        self._observe_motion()
+        super()._handle_coordinator_update()
+
+    @callback
+    def _observe_motion(self) -> None:
+        """Feed the motion model, poll faster only while this blind moves."""
+        position: float | None = None
+        with suppress(TypeError, ValueError):
+            position = float(self.coordinator.get_raw_value(self._attr_unique_id))
+        direction = 0
+        if self.is_closing:
+            direction = 1
+        elif self.is_opening:
+            direction = -1
+        self._motion.observe(position, direction, self.hass.loop.time())
+
+        if direction == 0:
+            self._async_stop_motion()
+        elif self._unsub_motion is None:
+            self._motion_ticks = 0
+            self._motion_failures = 0
+            self._unsub_motion = async_track_time_interval(
+                self.hass, self._async_motion_tick, COVER_MOTION_TICK
+            )
+
+    @callback
+    def _async_stop_motion(self) -> None:
+        """Stop the motion tracking."""
+        if self._unsub_motion is not None:
+            self._unsub_motion()
+            self._unsub_motion = None
+
+    async def _async_motion_tick(self, now: datetime) -> None:
+        """Interpolate the position of the moving blind and read it frequently."""
+        self._motion_ticks += 1
+        # the ticks do not wait for a slow read, skip it while one is running
+        if self._motion_ticks % COVER_FAST_POLL_TICKS == 0 and not self._motion_reading:
+            self._motion_reading = True
+            try:
+                await self.coordinator.async_read(self._motion_tags)
+            except CybroError as error:
+                LOGGER.debug("%s: fast read failed: %s", self._attr_unique_id, error)
+                self._motion_failures += 1
+                if self._motion_failures >= COVER_FAST_READ_FAILURES:
+                    # the regular poll takes over
+                    self._async_stop_motion()
+            else:
+                self._motion_failures = 0
+                self._observe_motion()
+            finally:
+                self._motion_reading = False
+        if self._motion.arrived(self.hass.loop.time()):
+            # no more interpolation, the regular poll confirms the stop
+            self._async_stop_motion()
+        self.async_write_ha_state()
+
+    def get_scene_write(
+        self, state: str | None, attributes: dict[str, Any]
+    ) -> HiqWriteRequest | None:
+        """Return the writes to bring the blind into a scene state."""
+        for attr in (ATTR_POSITION, ATTR_CURRENT_POSITION):
+            if attr in attributes:
+                return self._get_move_write(100 - int(attributes[attr]))
+        if state == STATE_OPEN:
+            return self._get_move_write(0)
+        if state == STATE_CLOSED:
+            return self._get_move_write(100)
+        return None
 
     @property
     def extra_state_attributes(self):
         """Return the state attributes."""
-        try:
-            desc = self.coordinator.data.vars[self._attr_unique_id].description
-        except KeyError:
-            desc = "?"
+        desc = self.coordinator.get_description(self._attr_unique_id)
         return {
             ATTR_DESCRIPTION: desc,
             ATTR_VARIABLE: self._attr_unique_id,
+            ATTR_TRAVEL_TIME: round(self._motion.travel_time, 1),
         }
@@ -0,0 +1,65 @@
+"""Entity discovery plan of a HIQ controller."""
+from __future__ import annotations
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+from dataclasses import field
+from re import match
+
+from .catalog import tag_module
+
+
+@dataclass
+class HiqDiscoveryPlan:
+    """Variables of a controller grouped for the discovery of the platforms.
+
+    The platforms only look at the variables of the modules they handle,
+    instead of searching all variables of the controller each.
+    """
+
+    modules: dict[str, list[str]] = field(default_factory=dict)
+    """variables (with prefix) by module, eg: th00, lc01, hvac, weather"""
+    thermostats: list[str] = field(default_factory=list)
+    """thermostat identifiers, eg: c1000.th00"""
+
+    def keys(self, *kinds: str) -> list[str]:
+        """Return the variables of all modules starting with one of the kinds.
+
+        eg: "th" for all thermostats, "lc" for all on/off lights.
+        """
+        return [
+            key
+            for module, keys in self.modules.items()
+            if module.startswith(kinds)
+            for key in keys
+        ]
+
+    @property
+    def controller_keys(self) -> list[str]:
+        """Return the variables of the controller modules (not numbered).
+
+        eg: c1000.hvac_mode, c1000.outdoor_temperature_enable
+        """
+        return [
+            key
+            for module, keys in self.modules.items()
+            if not module[-1:].isdigit()
+            for key in keys
+        ]
+
+
+def plan_discovery(prefix: str, plc_vars: Iterable[str]) -> HiqDiscoveryPlan:
+    """Group the variables of a controller for the discovery.
+
+    Only CPU work, so it can run in the executor for large programs.
+    """
+    plan = HiqDiscoveryPlan()
+    for key in plc_vars:
+        if not key.startswith(prefix):
+            continue
+        module = tag_module(key[len(prefix) :])
+        plan.modules.setdefault(module, []).append(key)
+    for module in plan.modules:
+        if match(r"th\d+$", module):
+            plan.thermostats.append(f"{prefix}{module}")
+    return plan
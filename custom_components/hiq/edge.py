@@ -0,0 +1,108 @@
+"""Edge capture of selected HIQ-Home tags."""
+from __future__ import annotations
+
+from collections.abc import Callable
+from datetime import datetime
+
+from cybro import CybroError
+from homeassistant.core import HomeAssistant
+from homeassistant.core import callback
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.util import dt as dt_util
+
+from .const import EDGE_SAMPLE_INTERVAL
+from .const import EVENT_EDGE
+from .const import LOGGER
+from .coordinator import HiqDataUpdateCoordinator
+
+
+class HiqEdgeCapture:
+    """Sample a few tags between the polls and fire an event on every change.
+
+    Only the selected tags are read at the high rate, the regular poll of the
+    controller is not changed. Short pulses which are shorter than the sample
+    interval can be caught with a PLC side counter or latch tag.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        coordinator: HiqDataUpdateCoordinator,
+        tags: list[str],
+    ) -> None:
+        """Initialize the edge capture of some tags."""
+        self.hass = hass
+        self.coordinator = coordinator
+        self.tags = tags
+        self._last: dict[str, str | None] = {
+            tag: coordinator.values.get_raw(tag) for tag in tags
+        }
+        self._sampling = False
+        self._unsub: list[Callable] = []
+        for tag in tags:
+            coordinator.add_var(tag)
+
+    @callback
+    def async_start(self) -> None:
+        """Start sampling the tags."""
+        self._unsub = [
+            async_track_time_interval(
+                self.hass,
+                self._async_sample,
+                EDGE_SAMPLE_INTERVAL,
+                name=f"hiq edge capture {self.coordinator.unique_id}",
+            ),
+            # the regular poll is a sample too
+            self.coordinator.async_add_listener(self._async_detect_edges),
+        ]
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop sampling the tags."""
+        for unsub in self._unsub:
+            unsub()
+        self._unsub = []
+
+    async def _async_sample(self, now: datetime) -> None:
+        """Read the tags and update the entities of the changed tags."""
+        if self._sampling or not self.coordinator.last_update_success:
+            return
+        self._sampling = True
+        try:
+            await self.coordinator.async_read(self.tags)
+        except CybroError as error:
+            LOGGER.debug("edge capture: read failed: %s", error)
+            return
+        finally:
+            self._sampling = False
+        if not (changed := self._async_detect_edges()):
+            return
+        # only these entities, the other listeners follow the regular poll
+        for entity in list(self.coordinator.entities.values()):
+            if any(entity.uses_tag(tag) for tag in changed):
+                entity.async_handle_tag_update()
+
+    @callback
+    def _async_detect_edges(self) -> list[str]:
+        """Fire an event for every changed tag, return the changed tags."""
+        changed: list[str] = []
+        for tag in self.tags:
+            value = self.coordinator.values.get_raw(tag)
+            if value == (previous := self._last[tag]):
+                continue
+            self._last[tag] = value
+            changed.append(tag)
+            if previous is None or value is None:
+                # first read or tag lost, no edge
+                continue
+            LOGGER.debug("edge capture: %s %s -> %s", tag, previous, value)
+            self.hass.bus.async_fire(
+                EVENT_EDGE,
+                {
+                    "tag": tag,
+                    "value": value,
+                    "previous": previous,
+                    "time": dt_util.utcnow().isoformat(),
+                },
+            )
+        return changed
@@ -0,0 +1,180 @@
+"""Energy statistics of the HIQ-Home power meter."""
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime
+from datetime import timedelta
+from math import inf
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.models import StatisticData
+from homeassistant.components.recorder.models import StatisticMetaData
+from homeassistant.components.recorder.statistics import async_add_external_statistics
+from homeassistant.components.recorder.statistics import get_last_statistics
+from homeassistant.const import UnitOfEnergy
+from homeassistant.const import UnitOfPower
+from homeassistant.core import HomeAssistant
+from homeassistant.core import callback
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+from .const import ENERGY_MAX_SAMPLE_GAP
+from .const import LOGGER
+from .coordinator import HiqDataUpdateCoordinator
+
+
+@dataclass
+class HiqPowerPeriod:
+    """Power samples and integrated energy of one statistics period."""
+
+    start: datetime
+    """start of the period"""
+    energy: float = 0.0
+    """integrated energy [Wh]"""
+    minimum: float = inf
+    """lowest power [W]"""
+    maximum: float = -inf
+    """highest power [W]"""
+    duration: float = 0.0
+    """integrated time [s]"""
+
+    def add(self, power_from: float, power_to: float, seconds: float) -> None:
+        """Add a linear power segment to the period."""
+        self.energy += (power_from + power_to) / 2 * seconds / 3600
+        self.duration += seconds
+        self.minimum = min(self.minimum, power_from, power_to)
+        self.maximum = max(self.maximum, power_from, power_to)
+
+    @property
+    def mean(self) -> float | None:
+        """Return the time weighted mean power [W]."""
+        if self.duration <= 0:
+            return None
+        return self.energy * 3600 / self.duration
+
+
+class HiqEnergyStatistics:
+    """Integrate the power meter between polls into hourly statistics.
+
+    The statistics are imported as external statistics, hiq:<nad>_power for
+    the mean / min / max power and hiq:<nad>_energy for the energy sum.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, coordinator: HiqDataUpdateCoordinator, tag: str
+    ) -> None:
+        """Initialize the statistics of one power meter tag."""
+        self.hass = hass
+        self.coordinator = coordinator
+        self._tag = tag
+        self._power_id = f"{DOMAIN}:{coordinator.unique_id}_power"
+        self._energy_id = f"{DOMAIN}:{coordinator.unique_id}_energy"
+        self._sum: float = 0.0
+        self._last: tuple[datetime, float] | None = None
+        self._period: HiqPowerPeriod | None = None
+        self._unsub: Callable | None = None
+        coordinator.add_var(tag)
+
+    async def async_start(self) -> None:
+        """Continue the energy sum of the recorder and follow the polls."""
+        last = await get_instance(self.hass).async_add_executor_job(
+            get_last_statistics, self.hass, 1, self._energy_id, True, {"sum"}
+        )
+        if rows := last.get(self._energy_id):
+            self._sum = rows[0].get("sum") or 0.0
+        self._unsub = self.coordinator.async_add_listener(self._handle_update)
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop following the polls."""
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+
+    @callback
+    def _handle_update(self) -> None:
+        """Add the polled power to the current period."""
+        if not self.coordinator.last_update_success:
+            return
+        if (power := self.coordinator.values.get_float(self._tag)) is None:
+            self._last = None
+            return
+        self.add_sample(dt_util.utcnow(), power)
+
+    def add_sample(self, now: datetime, power: float) -> None:
+        """Integrate the power since the last sample, split at full hours."""
+        if self._period is None:
+            self._period = HiqPowerPeriod(_start_of_hour(now))
+        last, self._last = self._last, (now, power)
+        if last is None or now - last[0] > ENERGY_MAX_SAMPLE_GAP:
+            # no integration over missing samples
+            last = (now, power)
+
+        while now >= (end := self._period.start + timedelta(hours=1)):
+            if last[0] < end:
+                # interpolate the power at the end of the period
+                power_end = last[1] + (power - last[1]) * (
+                    (end - last[0]) / (now - last[0])
+                )
+                self._period.add(last[1], power_end, (end - last[0]).total_seconds())
+                last = (end, power_end)
+            self._async_import(self._period)
+            self._period = HiqPowerPeriod(_start_of_hour(max(now, end)))
+        self._period.add(last[1], power, (now - last[0]).total_seconds())
+
+    @callback
+    def _async_import(self, period: HiqPowerPeriod) -> None:
+        """Import the statistics of a closed period."""
+        if (mean := period.mean) is None:
+            return
+        self._sum += period.energy / 1000
+        LOGGER.debug(
+            "%s: %s mean %.0f W, %.3f kWh",
+            self._tag,
+            period.start,
+            mean,
+            period.energy / 1000,
+        )
+        async_add_external_statistics(
+            self.hass,
+            StatisticMetaData(
+                has_mean=True,
+                has_sum=False,
+                name=f"{self.coordinator.unique_id} power",
+                source=DOMAIN,
+                statistic_id=self._power_id,
+                unit_of_measurement=UnitOfPower.WATT,
+            ),
+            [
+                StatisticData(
+                    start=period.start,
+                    mean=mean,
+                    min=period.minimum,
+                    max=period.maximum,
+                )
+            ],
+        )
+        async_add_external_statistics(
+            self.hass,
+            StatisticMetaData(
+                has_mean=False,
+                has_sum=True,
+                name=f"{self.coordinator.unique_id} energy",
+                source=DOMAIN,
+                statistic_id=self._energy_id,
+                unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+            ),
+            [
+                StatisticData(
+                    start=period.start,
+                    state=self._sum,
+                    sum=self._sum,
+                )
+            ],
+        )
+
+
+def _start_of_hour(now: datetime) -> datetime:
+    """Return the start of the hour of a point in time."""
+    return now.replace(minute=0, second=0, microsecond=0)
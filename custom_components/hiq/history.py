@@ -0,0 +1,65 @@
+"""Short polled value history of HIQ-Home tags."""
+from __future__ import annotations
+
+from collections import deque
+
+
+class HiqTagHistory:
+    """Sliding time window over the polled values of a tag.
+
+    The running minimum and maximum are kept in monotonic deques, so each
+    poll costs O(1) amortized. All samples are only kept if the change over
+    the window is needed.
+    """
+
+    __slots__ = ("window", "_samples", "_min", "_max")
+
+    def __init__(self, window: float, keep_samples: bool = False) -> None:
+        """Initialize the history of a tag.
+
+        window: length of the window [s]
+        keep_samples: keep all samples for the change over the window
+        """
+        self.window = window
+        self._samples: deque[tuple[float, float]] | None = (
+            deque() if keep_samples else None
+        )
+        self._min: deque[tuple[float, float]] = deque()
+        self._max: deque[tuple[float, float]] = deque()
+
+    def add(self, now: float, value: float) -> None:
+        """Add a polled value and drop the samples outside of the window."""
+        sample = (now, value)
+        while self._min and self._min[-1][1] >= value:
+            self._min.pop()
+        self._min.append(sample)
+        while self._max and self._max[-1][1] <= value:
+            self._max.pop()
+        self._max.append(sample)
+
+        oldest = now - self.window
+        while self._min[0][0] < oldest:
+            self._min.popleft()
+        while self._max[0][0] < oldest:
+            self._max.popleft()
+        if (samples := self._samples) is not None:
+            samples.append(sample)
+            while samples[0][0] < oldest:
+                samples.popleft()
+
+    @property
+    def minimum(self) -> float | None:
+        """Return the lowest value within the window."""
+        return self._min[0][1] if self._min else None
+
+    @property
+    def maximum(self) -> float | None:
+        """Return the highest value within the window."""
+        return self._max[0][1] if self._max else None
+
+    @property
+    def change(self) -> float | None:
+        """Return the change from the oldest to the latest value in the window."""
+        if not self._samples:
+            return None
+        return self._samples[-1][1] - self._samples[0][1]
@@ -1,18 +1,26 @@
 """Support for HIQ-Home lights."""
 from __future__ import annotations
 
+import asyncio
 from dataclasses import dataclass
 from re import sub
+from sys import intern
 from typing import Any
 
+from cybro import CybroError
 from homeassistant.components.light import ATTR_BRIGHTNESS
 from homeassistant.components.light import ATTR_HS_COLOR
+from homeassistant.components.light import ATTR_TRANSITION
 from homeassistant.components.light import ColorMode
 from homeassistant.components.light import LightEntity
 from homeassistant.components.light import LightEntityDescription
+from homeassistant.components.light import LightEntityFeature
 from homeassistant.components.light import filter_supported_color_modes
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import STATE_OFF
+from homeassistant.const import STATE_ON
 from homeassistant.core import HomeAssistant
+from homeassistant.core import callback
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
@@ -26,7 +34,9 @@ from .const import DOMAIN
 from .const import LOGGER
 from .const import MANUFACTURER
 from .const import MANUFACTURER_URL
+from .const import TRANSITION_MIN_INTERVAL
 from .coordinator import HiqDataUpdateCoordinator
+from .coordinator import HiqWriteRequest
 from .models import HiqEntity
 
 
@@ -68,11 +78,8 @@ def is_general_error_ok(coordinator: HiqDataUpdateCoordinator, var: str) -> bool
     if ge_names is None:
         return False
     ge_name = f"{ge_names[0]}_general_error"
-    coordinator.data.add_var(ge_name)
-    ge_val = coordinator.data.vars.get(ge_name, None)
-    if ge_val is None:
-        return False
-    return bool(ge_val.value == "0")
+    coordinator.add_var(ge_name)
+    return coordinator.values.get_raw(ge_name) == "0"
 
 
 def find_on_off_lights(
@@ -82,7 +89,7 @@ def find_on_off_lights(
     eg: c1000.lc00_qx00 and so on.
     """
     res: list[HiqUpdateLight] = []
-    for key in coordinator.data.plc_info.plc_vars:
+    for key in coordinator.discovery.keys("lc"):
         if (
             key.find(".lc") != -1
             and key.find("_qx") != -1
@@ -125,7 +132,7 @@ def find_dimm_lights(
     eg: c1000.ld00_qw00 and so on.
     """
     res: list[HiqUpdateLight] = []
-    for key in coordinator.data.plc_info.plc_vars:
+    for key in coordinator.discovery.keys("ld"):
         if key.find(".ld") != -1 and key.find("_qw") != -1:
             if is_general_error_ok(coordinator, key):
                 is_rgb_light = _is_rgb_light(coordinator, key)
@@ -203,16 +210,16 @@ def _is_rgb_light(coordinator: HiqDataUpdateCoordinator, var: str) -> bool:
     else:
         return False
 
-    coordinator.data.add_var(rgb_mode_var)
-    rgb_val = coordinator.data.vars.get(rgb_mode_var, None)
+    coordinator.add_var(rgb_mode_var)
+    rgb_val = coordinator.values.get_raw(rgb_mode_var)
     if rgb_val is None:
         return False
     LOGGER.debug(
         "%s -> %s",
         rgb_mode_var,
-        rgb_val.value,
+        rgb_val,
     )
-    return bool(rgb_val.value == "1")
+    return bool(rgb_val == "1")
 
 
 class HiqUpdateLight(HiqEntity, LightEntity):
@@ -232,18 +239,20 @@ class HiqUpdateLight(HiqEntity, LightEntity):
         """Initialize HIQ-Home light."""
         super().__init__(coordinator=coordinator)
         self.entity_description = entity_description
-        self._attr_unique_id = unique_id or entity_description.key
-        self._dimming_out = dimming_out
-        self._rgb_hue_out = rgb_hue_out
-        self._rgb_sat_out = rgb_sat_out
+        self._attr_unique_id = intern(unique_id or entity_description.key)
+        self._dimming_out = dimming_out and intern(dimming_out)
+        self._rgb_hue_out = rgb_hue_out and intern(rgb_hue_out)
+        self._rgb_sat_out = rgb_sat_out and intern(rgb_sat_out)
         # self._attr_name = f"Light {var_name}"
         self._attr_icon = attr_icon
         self._attr_device_info = dev_info
         LOGGER.debug(self._attr_unique_id)
-        coordinator.data.add_var(self._attr_unique_id, var_type=0)
+        coordinator.add_var(self._attr_unique_id, var_type=0)
         supported_color_modes: set[ColorMode] = set()
+        self._transition: asyncio.Task | None = None
         if dimming_out:
             self._attr_color_mode = ColorMode.BRIGHTNESS
+            self._attr_supported_features = LightEntityFeature.TRANSITION
             supported_color_modes.add(ColorMode.BRIGHTNESS)
             LOGGER.debug("dimming light: %s", self._attr_unique_id)
         if rgb_hue_out and rgb_sat_out:
@@ -259,27 +268,36 @@ class HiqUpdateLight(HiqEntity, LightEntity):
             supported_color_modes
         )
 
+    def uses_tag(self, tag: str) -> bool:
+        """Return True if the state of the light depends on a tag."""
+        return tag in (
+            self._attr_unique_id,
+            self._dimming_out,
+            self._rgb_hue_out,
+            self._rgb_sat_out,
+        )
+
     @property
     def hs_color(self) -> tuple[float, float] | None:
         """Return the hue and saturation color value [float, float]."""
         if self._rgb_hue_out is None or self._rgb_sat_out is None:
             return None
-        hue = self.coordinator.data.vars.get(self._rgb_hue_out, None)
-        sat = self.coordinator.data.vars.get(self._rgb_sat_out, None)
-        if sat is None or sat.value == "?" or hue is None or hue.value == "?":
+        hue = self.coordinator.get_raw_value(self._rgb_hue_out)
+        sat = self.coordinator.get_raw_value(self._rgb_sat_out)
+        if sat is None or sat == "?" or hue is None or hue == "?":
             return None
-        return [int(int(hue.value) * 3.6), int(sat.value)]
+        return [int(int(hue) * 3.6), int(sat)]
 
     @property
     def brightness(self) -> int | None:
         """Return the brightness of this light between 1..255."""
         if self._dimming_out is None:
             return None
-        res = self.coordinator.data.vars.get(self._dimming_out, None)
-        if res is None or res.value == "?":
+        res = self.coordinator.get_raw_value(self._dimming_out)
+        if res is None or res == "?":
             LOGGER.debug("%s -> unknown brightness", self._attr_unique_id)
             return None
-        return int(int(res.value) * 2.55)
+        return int(int(res) * 2.55)
 
     @property
     def is_on(self) -> bool:
@@ -288,36 +306,111 @@ class HiqUpdateLight(HiqEntity, LightEntity):
 
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn off the light."""
-        await self.coordinator.cybro.write_var(self.unique_id, "0")
-        await self.coordinator.async_refresh()
+        self._async_cancel_transition()
+        if kwargs.get(ATTR_TRANSITION) and self._dimming_out:
+            self._async_start_transition(0, kwargs[ATTR_TRANSITION], {})
+            return
+        await self.coordinator.async_write({self.unique_id: "0"})
 
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn on the light."""
         LOGGER.debug("Light '%s' -> %s", self._attr_unique_id, kwargs)
-        if ATTR_BRIGHTNESS in kwargs:
-            await self.coordinator.cybro.write_var(
-                self._dimming_out, str(int(kwargs[ATTR_BRIGHTNESS]) / 2.55)
-            )
-        if ATTR_HS_COLOR in kwargs:
-            hue, sat = kwargs[ATTR_HS_COLOR]
-            await self.coordinator.cybro.write_var(
-                self._rgb_hue_out, str(int(int(hue) / 3.6))
+        self._async_cancel_transition()
+        request = self._get_turn_on_write(kwargs)
+        if kwargs.get(ATTR_TRANSITION) and self._dimming_out in request.tags:
+            target = int(request.tags.pop(self._dimming_out))
+            self._async_start_transition(target, kwargs[ATTR_TRANSITION], request.tags)
+            return
+        # all attributes in one request, so the lamp does not step through colors
+        await self.coordinator.async_write_many([request])
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Stop a running transition."""
+        self._async_cancel_transition()
+        await super().async_will_remove_from_hass()
+
+    @callback
+    def _async_cancel_transition(self) -> None:
+        """Cancel a running transition, a new state supersedes it."""
+        if self._transition is not None and not self._transition.done():
+            LOGGER.debug("Light '%s' transition cancelled", self._attr_unique_id)
+            self._transition.cancel()
+        self._transition = None
+
+    @callback
+    def _async_start_transition(
+        self, target: int, duration: float, tags: dict[str, str]
+    ) -> None:
+        """Start to fade the dimming output to a target level (0..100)."""
+        start = 0.0
+        if self.is_on and (brightness := self.brightness) is not None:
+            start = brightness / 2.55
+        self._transition = self.coordinator.config_entry.async_create_background_task(
+            self.hass,
+            self._async_run_transition(start, target, duration, tags),
+            f"hiq light transition {self._attr_unique_id}",
+        )
+
+    async def _async_run_transition(
+        self, start: float, target: int, duration: float, tags: dict[str, str]
+    ) -> None:
+        """Write intermediate levels at a bounded rate, finish with a read back.
+
+        The level is calculated from the elapsed time, so a slow scgi server
+        results in less (but larger) steps instead of a growing backlog.
+        A failed write stops the transition, the read back shows the level
+        the light actually has.
+        """
+        loop = self.hass.loop
+        begin = loop.time()
+        last_level: int | None = None
+        try:
+            while (elapsed := loop.time() - begin) < duration:
+                level = int(start + (target - start) * elapsed / duration)
+                if level != last_level:
+                    await self.coordinator.async_write(
+                        {**tags, self._dimming_out: str(level)}, refresh=False
+                    )
+                    tags = {}
+                    last_level = level
+                await asyncio.sleep(TRANSITION_MIN_INTERVAL)
+            await self.coordinator.async_write(
+                {**tags, self._dimming_out: str(target)}
             )
-            await self.coordinator.cybro.write_var(self._rgb_sat_out, str(int(sat)))
-        if not kwargs:
+        except CybroError as error:
+            LOGGER.warning("%s: transition stopped: %s", self._attr_unique_id, error)
+            await self.coordinator.async_refresh()
+
+    def _get_turn_on_write(self, attributes: dict[str, Any]) -> HiqWriteRequest:
+        """Return the writes to turn on the light with the given attributes."""
+        tags: dict[str, str] = {}
+        if ATTR_BRIGHTNESS in attributes and self._dimming_out:
+            tags[self._dimming_out] = str(int(attributes[ATTR_BRIGHTNESS] / 2.55))
+        if ATTR_HS_COLOR in attributes and self._rgb_hue_out and self._rgb_sat_out:
+            hue, sat = attributes[ATTR_HS_COLOR]
+            tags[self._rgb_hue_out] = str(int(int(hue) / 3.6))
+            tags[self._rgb_sat_out] = str(int(sat))
+        if not tags:
             if self._dimming_out is None:
-                await self.coordinator.cybro.write_var(self.unique_id, "1")
+                tags[self.unique_id] = "1"
             else:
-                await self.coordinator.cybro.write_var(self._dimming_out, "100")
-        await self.coordinator.async_refresh()
+                tags[self._dimming_out] = "100"
+        return HiqWriteRequest(tags)
+
+    def get_scene_write(
+        self, state: str | None, attributes: dict[str, Any]
+    ) -> HiqWriteRequest | None:
+        """Return the writes to bring the light into a scene state."""
+        if state == STATE_OFF:
+            return HiqWriteRequest({self.unique_id: "0"})
+        if state not in (STATE_ON, None):
+            return None
+        return self._get_turn_on_write(attributes)
 
     @property
     def extra_state_attributes(self):
         """Return the state attributes."""
-        try:
-            desc = self.coordinator.data.vars[self._attr_unique_id].description
-        except KeyError:
-            desc = "?"
+        desc = self.coordinator.get_description(self._attr_unique_id)
         return {
             ATTR_DESCRIPTION: desc,
             ATTR_VARIABLE: self._attr_unique_id,
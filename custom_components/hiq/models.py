@@ -1,4 +1,8 @@
 """Models for HIQ-Home."""
+from abc import ABC
+from abc import abstractmethod
+from typing import Any
+
 from homeassistant.const import (
     ATTR_CONFIGURATION_URL,
     ATTR_IDENTIFIERS,
@@ -6,15 +10,27 @@ from homeassistant.const import (
     ATTR_MODEL,
     ATTR_NAME,
     ATTR_SW_VERSION,
+    CONF_UNIQUE_ID,
 )
+from homeassistant.core import HomeAssistant
+from homeassistant.core import callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import (
+    CONF_TAG,
     DEVICE_DESCRIPTION,
+    DEVICE_HW_VERSION,
+    DEVICE_SW_VERSION,
+    DOMAIN,
+    LOGGER,
     MANUFACTURER,
     MANUFACTURER_URL,
 )
 from .coordinator import HiqDataUpdateCoordinator
+from .coordinator import HiqWriteRequest
 
 
 class HiqEntity(CoordinatorEntity):
@@ -38,3 +54,110 @@ class HiqEntity(CoordinatorEntity):
             ATTR_SW_VERSION: self.coordinator.data.server_info.server_version,
             ATTR_CONFIGURATION_URL: MANUFACTURER_URL,
         }
+
+    async def async_added_to_hass(self) -> None:
+        """Register the entity at its coordinator."""
+        await super().async_added_to_hass()
+        self.coordinator.entities[self.entity_id] = self
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Unregister the entity from its coordinator."""
+        self.coordinator.entities.pop(self.entity_id, None)
+        await super().async_will_remove_from_hass()
+
+    def uses_tag(self, tag: str) -> bool:
+        """Return True if the state of the entity depends on a tag."""
+        if tag == self.unique_id:
+            return True
+        description = getattr(self, "entity_description", None)
+        return description is not None and tag == description.key
+
+    @callback
+    def async_handle_tag_update(self) -> None:
+        """Write the state after some of its tags were read between the polls."""
+        self.async_write_ha_state()
+
+    def get_scene_write(
+        self, state: str | None, attributes: dict[str, Any]
+    ) -> HiqWriteRequest | None:
+        """Return the writes to bring the entity into a scene state.
+
+        Entities which can not be batched return None.
+        """
+        return None
+
+
+class HiqCustomEntities(ABC):
+    """Custom entities of one platform in the config entry options.
+
+    Options changes add, replace or remove single entities instead of
+    reloading the whole config entry. Subclasses create the entities.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        coordinator: HiqDataUpdateCoordinator,
+        async_add_entities: AddEntitiesCallback,
+    ) -> None:
+        """Initialize the custom entities of a controller."""
+        self.hass = hass
+        self.coordinator = coordinator
+        self._async_add_entities = async_add_entities
+        self._configs: dict[str, dict[str, Any]] = {}
+        self._entities: dict[str, HiqEntity] = {}
+        self._dev_info = DeviceInfo(
+            identifiers={(DOMAIN, f"{coordinator.data.plc_info.nad} custom")},
+            manufacturer=MANUFACTURER,
+            name=f"c{coordinator.cybro.nad} custom",
+            model=DEVICE_DESCRIPTION,
+            configuration_url=MANUFACTURER_URL,
+            entry_type=None,
+            sw_version=DEVICE_SW_VERSION,
+            hw_version=DEVICE_HW_VERSION,
+        )
+
+    async def async_update(
+        self, configs: list[dict[str, Any]], refresh: bool = True
+    ) -> None:
+        """Apply the custom entity options, only touch changed entities."""
+        new_configs = {get_custom_key(config): config for config in configs}
+        entity_registry = er.async_get(self.hass)
+
+        for key, config in list(self._configs.items()):
+            if new_configs.get(key) == config:
+                continue
+            # removed or edited: remove the entity and its tag
+            entity = self._entities.pop(key)
+            self._configs.pop(key)
+            LOGGER.debug("remove custom entity: %s", entity.unique_id)
+            await entity.async_remove()
+            if key not in new_configs and entity.registry_entry is not None:
+                entity_registry.async_remove(entity.entity_id)
+            # still polled if other entities use the tag
+            self.coordinator.remove_var(entity.unique_id)
+            self.coordinator.forget_rendered(entity.unique_id)
+
+        new_entities: list[HiqEntity] = []
+        for key, config in new_configs.items():
+            if key in self._configs:
+                continue
+            entity = self._create_entity(config)
+            LOGGER.debug("add custom entity: %s", entity.unique_id)
+            self._configs[key] = config
+            self._entities[key] = entity
+            new_entities.append(entity)
+        if new_entities:
+            self._async_add_entities(new_entities)
+            if refresh:
+                # read the new tags at once, not with the next poll
+                await self.coordinator.async_request_refresh()
+
+    @abstractmethod
+    def _create_entity(self, config: dict[str, Any]) -> HiqEntity:
+        """Create the entity of a custom entity config."""
+
+
+def get_custom_key(config: dict[str, Any]) -> str:
+    """Return the key of a custom entity config (unique id or tag)."""
+    return config.get(CONF_UNIQUE_ID) or config[CONF_TAG]
@@ -5,6 +5,7 @@ from dataclasses import dataclass
 from datetime import datetime
 from re import search
 from re import sub
+from sys import intern
 
 from cybro import VarType
 from homeassistant.components.number import NumberDeviceClass
@@ -75,7 +76,7 @@ def add_th_tags(
     res: list[HiqNumberEntity] = []
 
     # find different thermostat vars
-    for key in coordinator.data.plc_info.plc_vars:
+    for key in coordinator.discovery.keys("th"):
         unique_id = key
         # identifier is cNAD.thNR
         grp = search(r"c\d+\.th\d+", key)
@@ -282,7 +283,7 @@ def add_hvac_tags(
     res: list[HiqNumberEntity] = []
 
     # find different hvac related vars
-    for key in coordinator.data.plc_info.plc_vars:
+    for key in coordinator.discovery.controller_keys:
         unique_id = key
         # identifier is cNAD
         grp = search(r"c\d+", key)
@@ -350,14 +351,14 @@ class HiqNumberEntity(HiqEntity, NumberEntity):
         """Initialize a HIQ-Home number entity."""
         super().__init__(coordinator=coordinator)
         self.entity_description = entity_description
-        self._attr_unique_id = unique_id or entity_description.key
-        self._var_write_req = var_write_req
+        self._attr_unique_id = intern(unique_id or entity_description.key)
+        self._var_write_req = var_write_req and intern(var_write_req)
         self._state = None
         self._attr_device_info = dev_info
         self._attr_mode = mode
 
         LOGGER.debug(self._attr_unique_id)
-        coordinator.data.add_var(self._attr_unique_id, var_type=var_type)
+        coordinator.add_var(self._attr_unique_id, var_type=var_type)
         self._var_type = var_type
         self._val_fact = val_fact
         self._attr_suggested_display_precision = display_precision
@@ -375,10 +376,7 @@ class HiqNumberEntity(HiqEntity, NumberEntity):
     @property
     def extra_state_attributes(self):
         """Return the state attributes."""
-        try:
-            desc = self.coordinator.data.vars[self._attr_unique_id].description
-        except KeyError:
-            desc = "?"
+        desc = self.coordinator.get_description(self._attr_unique_id)
         return {
             ATTR_DESCRIPTION: desc,
             ATTR_VARIABLE: self._attr_unique_id,
@@ -396,13 +394,10 @@ class HiqNumberEntity(HiqEntity, NumberEntity):
                 str(new_val),
                 self._var_write_req,
             )
-            await self.coordinator.cybro.request(
-                {
-                    self._attr_unique_id: str(new_val),
-                    self._var_write_req: "1",
-                }
+            # merged with other settings of the config group, refreshed once
+            await self.coordinator.async_write_config(
+                self._var_write_req, {self._attr_unique_id: str(new_val)}
             )
-        else:
-            LOGGER.debug("write value: %s -> %s", self._attr_unique_id, str(new_val))
-            await self.coordinator.cybro.write_var(self._attr_unique_id, new_val)
-        await self.coordinator.async_refresh()
+            return
+        LOGGER.debug("write value: %s -> %s", self._attr_unique_id, str(new_val))
+        await self.coordinator.async_write({self._attr_unique_id: str(new_val)})
@@ -0,0 +1,96 @@
+"""Durable outbox of HIQ-Home writes while the scgi server is unreachable."""
+from __future__ import annotations
+
+from typing import Any
+
+from cybro import Cybro
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.core import callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+from .const import LOGGER
+from .const import OUTBOX_MAX_AGE
+from .const import OUTBOX_SAVE_DELAY
+from .const import STORAGE_VERSION
+
+
+class HiqOutbox:
+    """Pending writes of a config entry, the last write of a tag wins.
+
+    The writes are persisted, so they survive a restart of Home Assistant,
+    and are sent in one request after the next successful poll. Writes older
+    than OUTBOX_MAX_AGE are dropped.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+        """Initialize the outbox of a config entry."""
+        self._store: Store[dict[str, list[Any]]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}.outbox"
+        )
+        self.tags: dict[str, str] = {}
+        # time (utc timestamp) the pending write of a tag was queued
+        self._queued_at: dict[str, float] = {}
+
+    async def async_load(self) -> None:
+        """Load the writes which were pending on shutdown."""
+        for tag, pending in (await self._store.async_load() or {}).items():
+            if not isinstance(pending, list):
+                # stored without a time, the age is unknown
+                continue
+            self.tags[tag], self._queued_at[tag] = pending
+        self._async_expire()
+        if self.tags:
+            LOGGER.debug("outbox: %s pending writes loaded", len(self.tags))
+
+    @callback
+    def async_add(self, tags: dict[str, str]) -> None:
+        """Queue writes, replacing pending writes of the same tags."""
+        now = dt_util.utcnow().timestamp()
+        self.tags.update(tags)
+        self._queued_at.update(dict.fromkeys(tags, now))
+        self._async_save()
+
+    async def async_flush(self, cybro: Cybro) -> dict[str, str]:
+        """Send all pending writes in one request, return the sent writes.
+
+        The writes stay queued if the request fails.
+        """
+        self._async_expire()
+        if not self.tags:
+            return {}
+        tags = dict(self.tags)
+        LOGGER.debug("outbox: write values: %s", tags)
+        await cybro.request(tags)
+        for tag, value in tags.items():
+            # keep writes queued while the request was running
+            if self.tags.get(tag) == value:
+                del self.tags[tag]
+                del self._queued_at[tag]
+        self._async_save()
+        return tags
+
+    @callback
+    def _async_expire(self) -> None:
+        """Drop the writes older than the maximum age."""
+        oldest = dt_util.utcnow().timestamp() - OUTBOX_MAX_AGE
+        expired = [tag for tag, queued in self._queued_at.items() if queued < oldest]
+        if not expired:
+            return
+        LOGGER.warning("outbox: writes queued too long ago dropped: %s", expired)
+        for tag in expired:
+            del self.tags[tag]
+            del self._queued_at[tag]
+        self._async_save()
+
+    @callback
+    def _async_save(self) -> None:
+        """Persist the pending writes with the time they were queued."""
+        self._store.async_delay_save(
+            lambda: {
+                tag: [value, self._queued_at[tag]] for tag, value in self.tags.items()
+            },
+            OUTBOX_SAVE_DELAY,
+        )
@@ -4,6 +4,7 @@ from __future__ import annotations
 from dataclasses import dataclass
 from re import search
 from re import sub
+from sys import intern
 from typing import Generic
 from typing import TypeVar
 
@@ -100,7 +101,7 @@ def add_th_tags(
     res: list[HiqSelectEntity] = []
 
     # find different thermostat vars
-    for key in coordinator.data.plc_info.plc_vars:
+    for key in coordinator.discovery.keys("th"):
         unique_id = key
         # identifier is cNAD.thNR
         grp = search(r"c\d+\.th\d+", key)
@@ -182,7 +183,7 @@ def add_hvac_tags(
     res: list[HiqSelectEntity] = []
 
     # find different hvac related vars
-    for key in coordinator.data.plc_info.plc_vars:
+    for key in coordinator.discovery.controller_keys:
         unique_id = key
         # identifier is cNAD
         grp = search(r"c\d+", key)
@@ -265,12 +266,12 @@ class HiqSelectEntity(HiqEntity, SelectEntity):
         """Initialize a HIQ-Home select entity."""
         super().__init__(coordinator=coordinator)
         self.entity_description = entity_description
-        self._attr_unique_id = unique_id or entity_description.key
-        self._var_write_req = var_write_req
+        self._attr_unique_id = intern(unique_id or entity_description.key)
+        self._var_write_req = var_write_req and intern(var_write_req)
         self._attr_device_info = dev_info
 
         LOGGER.debug(self._attr_unique_id)
-        coordinator.data.add_var(self._attr_unique_id, var_type=VarType.INT)
+        coordinator.add_var(self._attr_unique_id, var_type=VarType.INT)
         self._var_type = VarType.INT
         self._attr_options = list(attr_options)
         self._var_map = attr_options
@@ -291,10 +292,7 @@ class HiqSelectEntity(HiqEntity, SelectEntity):
     @property
     def extra_state_attributes(self):
         """Return the state attributes."""
-        try:
-            desc = self.coordinator.data.vars[self._attr_unique_id].description
-        except KeyError:
-            desc = "?"
+        desc = self.coordinator.get_description(self._attr_unique_id)
         return {
             ATTR_DESCRIPTION: desc,
             ATTR_VARIABLE: self._attr_unique_id,
@@ -310,20 +308,17 @@ class HiqSelectEntity(HiqEntity, SelectEntity):
                 str(option),
                 self._var_write_req,
             )
-            await self.coordinator.cybro.request(
-                {
-                    self._attr_unique_id: self._var_map[option],
-                    self._var_write_req: "1",
-                }
-            )
-        else:
-            LOGGER.debug(
-                "write value: %s -> %s (%s)",
-                self._attr_unique_id,
-                self._var_map[option],
-                str(option),
-            )
-            await self.coordinator.cybro.write_var(
-                self._attr_unique_id, self._var_map[option]
+            # merged with other settings of the config group, refreshed once
+            await self.coordinator.async_write_config(
+                self._var_write_req, {self._attr_unique_id: self._var_map[option]}
             )
-        await self.coordinator.async_refresh()
+            return
+        LOGGER.debug(
+            "write value: %s -> %s (%s)",
+            self._attr_unique_id,
+            self._var_map[option],
+            str(option),
+        )
+        await self.coordinator.async_write(
+            {self._attr_unique_id: self._var_map[option]}
+        )
@@ -1,6 +1,7 @@
 """Support for HIQ-Home sensors."""
 from __future__ import annotations
 
+from collections import deque
 from collections.abc import Callable
 from dataclasses import dataclass
 from datetime import datetime
@@ -11,6 +12,7 @@ from typing import Any
 import voluptuous as vol
 from cybro import VarType
 from homeassistant.components.sensor import CONF_STATE_CLASS
+from homeassistant.components.sensor import DOMAIN as SENSOR_DOMAIN
 from homeassistant.components.sensor import SensorDeviceClass
 from homeassistant.components.sensor import SensorEntity
 from homeassistant.components.sensor import SensorEntityDescription
@@ -30,9 +32,11 @@ from homeassistant.const import UnitOfSpeed
 from homeassistant.const import UnitOfTemperature
 from homeassistant.const import UnitOfTime
 from homeassistant.core import HomeAssistant
+from homeassistant.core import callback
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.template import Template
 from homeassistant.helpers.trigger_template_entity import (
     TEMPLATE_SENSOR_BASE_SCHEMA,
@@ -40,11 +44,16 @@ from homeassistant.helpers.trigger_template_entity import (
 from homeassistant.helpers.typing import ConfigType
 from homeassistant.helpers.typing import StateType
 
+from .breaker import STATE_CLOSED
+from .breaker import STATE_HALF_OPEN
+from .breaker import STATE_OPEN
 from .const import AREA_CLIMATE
 from .const import AREA_ENERGY
 from .const import AREA_SYSTEM
 from .const import AREA_WEATHER
 from .const import ATTR_DESCRIPTION
+from .const import ATTR_FAILURES
+from .const import ATTR_RETRY_IN
 from .const import ATTR_VARIABLE
 from .const import CONF_TAG
 from .const import DEVICE_DESCRIPTION
@@ -54,8 +63,14 @@ from .const import DOMAIN
 from .const import LOGGER
 from .const import MANUFACTURER
 from .const import MANUFACTURER_URL
+from .const import STORAGE_VERSION
+from .const import VOLTAGE_SCALE_LIMIT
+from .const import VOLTAGE_SCALE_MIN
+from .const import VOLTAGE_SCALE_SAVE_DELAY
+from .const import VOLTAGE_SCALE_WINDOW
 from .coordinator import HiqDataUpdateCoordinator
 from .light import is_general_error_ok
+from .models import HiqCustomEntities
 from .models import HiqEntity
 
 
@@ -83,8 +98,11 @@ async def async_setup_entry(
     # if weather is not None:
     #    async_add_entities(weather)
 
+    voltage_scales = HiqVoltageScales(hass, entry)
+    await voltage_scales.async_load()
     power_meter = find_power_meter(
         coordinator,
+        voltage_scales,
     )
     if power_meter is not None:
         async_add_entities(power_meter)
@@ -101,24 +119,19 @@ async def async_setup_entry(
     if hvac_tags is not None:
         async_add_entities(hvac_tags)
 
-    # add custom defined sensors
-    custom_entities: list = []
-    config = dict(entry.options)
-    if config.get("sensor") is None:
-        return
-    var_prefix = f"c{coordinator.cybro.nad}."
-    dev_info = DeviceInfo(
-        identifiers={(DOMAIN, f"{coordinator.data.plc_info.nad} custom")},
-        manufacturer=MANUFACTURER,
-        name=f"c{coordinator.cybro.nad} custom",
-        # suggested_area=AREA_SYSTEM,
-        model=DEVICE_DESCRIPTION,
-        configuration_url=MANUFACTURER_URL,
-        entry_type=None,
-        sw_version=DEVICE_SW_VERSION,
-        hw_version=DEVICE_HW_VERSION,
+    # add custom defined sensors, changed later without a reload
+    custom_sensors = HiqCustomSensors(hass, coordinator, async_add_entities)
+    coordinator.custom_entities[SENSOR_DOMAIN] = custom_sensors
+    await custom_sensors.async_update(
+        entry.options.get(SENSOR_DOMAIN, []), refresh=False
     )
-    for sensor in config["sensor"]:
+
+
+class HiqCustomSensors(HiqCustomEntities):
+    """Custom sensors of the config entry options."""
+
+    def _create_entity(self, sensor: dict[str, Any]) -> HiqSensorEntity:
+        """Create the entity of a custom sensor."""
         sensor_config: ConfigType = vol.Schema(
             TEMPLATE_SENSOR_BASE_SCHEMA.schema, extra=vol.ALLOW_EXTRA
         )(sensor)
@@ -128,29 +141,25 @@ async def async_setup_entry(
         value_string: str | None = sensor_config.get(CONF_VALUE_TEMPLATE)
 
         value_template: Template | None = (
-            Template(value_string, hass) if value_string is not None else None
+            Template(value_string, self.hass) if value_string is not None else None
         )
-        custom_entities.append(
-            HiqSensorEntity(
-                coordinator=coordinator,
-                entity_description=HiqSensorEntityDescription(
-                    key=f"{var_prefix}{sensor_config.get(CONF_TAG)}",
-                    name=name_string.template,
-                    state_class=SensorStateClass(sensor_config[CONF_STATE_CLASS])
-                    if sensor_config.get(CONF_STATE_CLASS) is not None
-                    else None,
-                    device_class=SensorDeviceClass(sensor_config[CONF_DEVICE_CLASS])
-                    if sensor_config.get(CONF_DEVICE_CLASS) is not None
-                    else None,
-                    native_unit_of_measurement=sensor_config.get(CONF_UNIT_OF_MEASUREMENT),
-                ),
-                dev_info=dev_info,
-                value_template=value_template,
-            )
+        return HiqSensorEntity(
+            coordinator=self.coordinator,
+            entity_description=HiqSensorEntityDescription(
+                key=f"c{self.coordinator.cybro.nad}.{sensor_config.get(CONF_TAG)}",
+                name=name_string.template,
+                state_class=SensorStateClass(sensor_config[CONF_STATE_CLASS])
+                if sensor_config.get(CONF_STATE_CLASS) is not None
+                else None,
+                device_class=SensorDeviceClass(sensor_config[CONF_DEVICE_CLASS])
+                if sensor_config.get(CONF_DEVICE_CLASS) is not None
+                else None,
+                native_unit_of_measurement=sensor_config.get(CONF_UNIT_OF_MEASUREMENT),
+            ),
+            dev_info=self._dev_info,
+            value_template=value_template,
         )
 
-    async_add_entities(custom_entities)
-
 
 @dataclass
 class HiqSensorEntityDescription(SensorEntityDescription):
@@ -201,6 +210,8 @@ def add_system_tags(
             dev_info=dev_info,
         )
     )
+    # state of the circuit breaker of the scgi server
+    res.append(HiqServerStateSensor(coordinator, dev_info))
     # find different plc diagnostic vars
     for key in coordinator.data.plc_info.plc_vars:
         if key.find(var_prefix) != -1:
@@ -311,7 +322,7 @@ def find_temperatures(
         via_device=(DOMAIN, coordinator.cybro.nad),
     )
 
-    for key in coordinator.data.plc_info.plc_vars:
+    for key in coordinator.discovery.keys("op", "ts", "fc"):
         if key.find(".op") != -1 or key.find(".ts") != -1 or key.find(".fc") != -1:
             if is_general_error_ok(coordinator, key):
                 if key.find("_temperature") != -1:
@@ -373,7 +384,7 @@ def find_weather(
         via_device=(DOMAIN, coordinator.cybro.nad),
     )
 
-    for key in coordinator.data.plc_info.plc_vars:
+    for key in coordinator.discovery.keys("weather"):
         if key.find(var_prefix) != -1:
             if is_general_error_ok(coordinator, key):
                 if key.find("_temperature") != -1:
@@ -435,6 +446,7 @@ def find_weather(
 
 def find_power_meter(
     coordinator: HiqDataUpdateCoordinator,
+    voltage_scales: HiqVoltageScales,
 ) -> list[HiqSensorEntity] | None:
     """Find power meter objects in the plc vars.
     eg: c1000.power_meter_power and so on.
@@ -453,7 +465,7 @@ def find_power_meter(
         hw_version=DEVICE_HW_VERSION,
         via_device=(DOMAIN, coordinator.cybro.nad),
     )
-    for key in coordinator.data.plc_info.plc_vars:
+    for key in coordinator.discovery.keys("power"):
         if key.find(var_prefix) != -1:
             if key.find("_power") != -1:
                 if _is_power_meter_ok(coordinator, key):
@@ -474,12 +486,8 @@ def find_power_meter(
                     )
             elif key.find("_voltage") != -1:
                 if _is_power_meter_ok(coordinator, key):
-                    fact = 1.0
-                    val = coordinator.data.vars.get(key, None)
-                    if val is not None and float(val.value.replace(",", "")) > 300:
-                        fact = 0.1
                     res.append(
-                        HiqSensorEntity(
+                        HiqVoltageSensorEntity(
                             coordinator=coordinator,
                             entity_description=HiqSensorEntityDescription(
                                 key=key,
@@ -490,8 +498,8 @@ def find_power_meter(
                                 suggested_display_precision=0,
                             ),
                             var_type=VarType.FLOAT,
-                            val_fact=fact,
                             dev_info=dev_info,
+                            voltage_scales=voltage_scales,
                         )
                     )
             elif key.find("_current") != -1:
@@ -558,12 +566,12 @@ def _is_power_meter_ok(coordinator: HiqDataUpdateCoordinator, var: str):
     if ge_names is None:
         return False
     ge_name = f"{ge_names[0]}_meter_error"
-    coordinator.data.add_var(ge_name)
-    ge_val = coordinator.data.vars.get(ge_name, None)
+    coordinator.add_var(ge_name)
+    ge_val = coordinator.values.get_raw(ge_name)
     if ge_val is None:
         return False
-    LOGGER.debug("%s -> %s", ge_name, ge_val.value)
-    return bool(ge_val.value == "0")
+    LOGGER.debug("%s -> %s", ge_name, ge_val)
+    return bool(ge_val == "0")
 
 
 def add_th_tags(
@@ -575,7 +583,7 @@ def add_th_tags(
     res: list[HiqSensorEntity] = []
 
     # find different thermostat vars
-    for key in coordinator.data.plc_info.plc_vars:
+    for key in coordinator.discovery.keys("th"):
         unique_id = key
         # identifier is cNAD.thNR
         grp = search(r"c\d+\.th\d+", key)
@@ -699,14 +707,14 @@ def add_hvac_tags(
 
     def _is_enabled(tag: str) -> bool:
         """Get enable state of variable."""
-        value = coordinator.data.vars.get(tag, None)
+        value = coordinator.values.get_raw(tag)
         if value is None:
             return False
-        LOGGER.debug("%s -> %s", tag, value.value)
-        return bool(value.value == "1")
+        LOGGER.debug("%s -> %s", tag, value)
+        return bool(value == "1")
 
     # find different hvac related vars
-    for key in coordinator.data.plc_info.plc_vars:
+    for key in coordinator.discovery.controller_keys:
         unique_id = key
         # identifier is cNAD
         grp = search(r"c\d+", key)
@@ -827,7 +835,7 @@ class HiqSensorEntity(HiqEntity, SensorEntity):
         LOGGER.debug(self._attr_unique_id)
         # set var type to string for template handling (conversion shall be done in template)
         self._var_type = var_type if value_template is None else VarType.STR
-        coordinator.data.add_var(self._attr_unique_id, var_type=self._var_type)
+        coordinator.add_var(self._attr_unique_id, var_type=self._var_type)
         self._val_fact = val_fact
         self._value_template = value_template
 
@@ -847,11 +855,143 @@ class HiqSensorEntity(HiqEntity, SensorEntity):
     @property
     def extra_state_attributes(self):
         """Return the state attributes."""
-        try:
-            desc = self.coordinator.data.vars[self._attr_unique_id].description
-        except KeyError:
-            desc = "?"
+        desc = self.coordinator.get_description(self._attr_unique_id)
         return {
             ATTR_DESCRIPTION: desc,
             ATTR_VARIABLE: self._attr_unique_id,
         }
+
+
+class HiqServerStateSensor(HiqEntity, SensorEntity):
+    """Circuit breaker state of the scgi server of a controller."""
+
+    _attr_device_class = SensorDeviceClass.ENUM
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_has_entity_name = True
+    _attr_options = [STATE_CLOSED, STATE_HALF_OPEN, STATE_OPEN]
+    _attr_translation_key = "server_state"
+
+    def __init__(
+        self, coordinator: HiqDataUpdateCoordinator, dev_info: DeviceInfo
+    ) -> None:
+        """Initialize the server state sensor of a controller."""
+        super().__init__(coordinator=coordinator)
+        self._attr_unique_id = f"{coordinator.unique_id}.server_state"
+        self._attr_device_info = dev_info
+
+    @property
+    def available(self) -> bool:
+        """Return True, the state is known while the server is not reachable."""
+        return True
+
+    @property
+    def native_value(self) -> str:
+        """Return the circuit breaker state."""
+        return self.coordinator.breaker.state
+
+    @property
+    def extra_state_attributes(self):
+        """Return the state attributes."""
+        breaker = self.coordinator.breaker
+        return {
+            ATTR_FAILURES: breaker.failures,
+            ATTR_RETRY_IN: None
+            if (retry_in := breaker.retry_in) is None
+            else round(retry_in),
+        }
+
+
+class HiqVoltageScales:
+    """Persisted voltage scaling factors of the power meter tags."""
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+        """Initialize the scaling factors of a config entry."""
+        self._store: Store[dict[str, float]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}.voltage_scale"
+        )
+        self._factors: dict[str, float] = {}
+
+    async def async_load(self) -> None:
+        """Load the settled scaling factors."""
+        self._factors = await self._store.async_load() or {}
+
+    def get(self, tag: str) -> float | None:
+        """Return the settled scaling factor of a tag."""
+        return self._factors.get(tag)
+
+    @callback
+    def async_set(self, tag: str, factor: float) -> None:
+        """Store a new scaling factor of a tag."""
+        self._factors[tag] = factor
+        self._store.async_delay_save(lambda: self._factors, VOLTAGE_SCALE_SAVE_DELAY)
+
+
+class HiqVoltageScaling:
+    """Detect the scaling factor of a voltage tag from a window of samples."""
+
+    def __init__(self, factor: float | None = None) -> None:
+        """Initialize the detector with an already settled factor."""
+        self.factor = factor
+        self._samples: deque[float] = deque(maxlen=VOLTAGE_SCALE_WINDOW)
+
+    def add(self, raw: float | None) -> bool:
+        """Add a raw sample, return True if a new factor was settled."""
+        if raw is None or raw <= VOLTAGE_SCALE_MIN:
+            # unknown or no mains voltage, no hint for the scaling
+            return False
+        factor = 0.1 if raw > VOLTAGE_SCALE_LIMIT else 1.0
+        self._samples.append(factor)
+        if len(self._samples) < VOLTAGE_SCALE_WINDOW or factor == self.factor:
+            return False
+        if any(sample != factor for sample in self._samples):
+            return False
+        self.factor = factor
+        return True
+
+
+class HiqVoltageSensorEntity(HiqSensorEntity):
+    """Defines a HIQ-Home voltage sensor with an auto calibrated scaling."""
+
+    def __init__(
+        self,
+        coordinator: HiqDataUpdateCoordinator,
+        entity_description: HiqSensorEntityDescription,
+        var_type: VarType,
+        dev_info: DeviceInfo,
+        voltage_scales: HiqVoltageScales,
+    ) -> None:
+        """Initialize a HIQ-Home voltage sensor entity."""
+        self._voltage_scales = voltage_scales
+        self._scaling = HiqVoltageScaling(voltage_scales.get(entity_description.key))
+        self._sampled_at: float | None = None
+        factor = self._scaling.factor
+        if factor is None:
+            # nothing settled yet, start with a guess from the current sample
+            raw = coordinator.values.get_float(entity_description.key)
+            factor = 0.1 if raw is not None and raw > VOLTAGE_SCALE_LIMIT else 1.0
+        super().__init__(
+            coordinator=coordinator,
+            entity_description=entity_description,
+            var_type=var_type,
+            val_fact=factor,
+            dev_info=dev_info,
+        )
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Follow the scaling of the polled voltage."""
+        # one sample per poll, not per update (eg: optimistic writes)
+        if (polled_at := self.coordinator.polled_at) != self._sampled_at:
+            self._sampled_at = polled_at
+            raw = self.coordinator.values.get_float(self._attr_unique_id)
+            if self._scaling.add(raw):
+                LOGGER.info(
+                    "%s: voltage scaling settled to %s",
+                    self._attr_unique_id,
+                    self._scaling.factor,
+                )
+                self._val_fact = self._scaling.factor
+                self._voltage_scales.async_set(
+                    self._attr_unique_id, self._scaling.factor
+                )
+        super()._handle_coordinator_update()
@@ -4,6 +4,8 @@ from __future__ import annotations
 from dataclasses import dataclass
 from re import search
 from re import sub
+from sys import intern
+from typing import Any
 from typing import Generic
 from typing import TypeVar
 
@@ -11,6 +13,8 @@ from cybro import VarType
 from homeassistant.components.switch import SwitchEntity
 from homeassistant.components.switch import SwitchEntityDescription
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import STATE_OFF
+from homeassistant.const import STATE_ON
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity import EntityCategory
@@ -24,6 +28,7 @@ from .const import DOMAIN
 from .const import LOGGER
 from .const import MANUFACTURER
 from .coordinator import HiqDataUpdateCoordinator
+from .coordinator import HiqWriteRequest
 from .light import is_general_error_ok
 from .models import HiqEntity
 
@@ -74,7 +79,7 @@ def add_th_tags(
     res: list[HiqSwitchEntity] = []
 
     # find different thermostat vars
-    for key in coordinator.data.plc_info.plc_vars:
+    for key in coordinator.discovery.keys("th"):
         unique_id = key
         # identifier is cNAD.thNR
         grp = search(r"c\d+\.th\d+", key)
@@ -135,7 +140,7 @@ def add_hvac_tags(
     res: list[HiqSwitchEntity] = []
 
     # find different hvac related vars
-    for key in coordinator.data.plc_info.plc_vars:
+    for key in coordinator.discovery.controller_keys:
         unique_id = key
         # identifier is cNAD
         grp = search(r"c\d+", key)
@@ -211,13 +216,13 @@ class HiqSwitchEntity(HiqEntity, SwitchEntity):
         """Initialize a HIQ-Home button entity."""
         super().__init__(coordinator=coordinator)
         self.entity_description = entity_description
-        self._attr_unique_id = unique_id or entity_description.key
-        self._var_write_req = var_write_req
+        self._attr_unique_id = intern(unique_id or entity_description.key)
+        self._var_write_req = var_write_req and intern(var_write_req)
         self._state = None
         self._attr_device_info = dev_info
 
         LOGGER.debug(self._attr_unique_id)
-        coordinator.data.add_var(self._attr_unique_id, var_type=VarType.INT)
+        coordinator.add_var(self._attr_unique_id, var_type=VarType.INT)
         self._var_type = VarType.INT
         self._var_invert = var_invert
 
@@ -233,53 +238,49 @@ class HiqSwitchEntity(HiqEntity, SwitchEntity):
 
     async def async_turn_off(self, **kwargs):
         """Turn the entity off."""
-        new_val = 1 if self._var_invert else 0
-        if self._var_write_req:
-            LOGGER.debug(
-                "write value: %s -> %s (+%s)",
-                self._attr_unique_id,
-                str(new_val),
-                self._var_write_req,
-            )
-            await self.coordinator.cybro.request(
-                {
-                    self._attr_unique_id: str(new_val),
-                    self._var_write_req: "1",
-                }
-            )
-        else:
-            LOGGER.debug("write value: %s -> %s", self._attr_unique_id, str(new_val))
-            await self.coordinator.cybro.write_var(self._attr_unique_id, new_val)
-        await self.coordinator.async_refresh()
+        await self._async_write_state(1 if self._var_invert else 0)
 
     async def async_turn_on(self, **kwargs):
         """Turn the entity on."""
-        new_val = 0 if self._var_invert else 1
+        await self._async_write_state(0 if self._var_invert else 1)
+
+    async def _async_write_state(self, new_val: int) -> None:
+        """Write the new switch state (+ optional write request)."""
+        LOGGER.debug(
+            "write value: %s -> %s (+%s)",
+            self._attr_unique_id,
+            str(new_val),
+            self._var_write_req,
+        )
         if self._var_write_req:
-            LOGGER.debug(
-                "write value: %s -> %s (+%s)",
-                self._attr_unique_id,
-                str(new_val),
-                self._var_write_req,
+            # merged with other settings of the config group, refreshed once
+            await self.coordinator.async_write_config(
+                self._var_write_req, {self._attr_unique_id: str(new_val)}
             )
-            await self.coordinator.cybro.request(
-                {
-                    self._attr_unique_id: str(new_val),
-                    self._var_write_req: "1",
-                }
-            )
-        else:
-            LOGGER.debug("write value: %s -> %s", self._attr_unique_id, str(new_val))
-            await self.coordinator.cybro.write_var(self._attr_unique_id, new_val)
-        await self.coordinator.async_refresh()
+            return
+        await self.coordinator.async_write_many([self._get_state_write(new_val)])
+
+    def _get_state_write(self, new_val: int) -> HiqWriteRequest:
+        """Return the writes for a new switch state (+ optional write request)."""
+        tags = {self._attr_unique_id: str(new_val)}
+        if self._var_write_req:
+            tags[self._var_write_req] = "1"
+        return HiqWriteRequest(tags, optimistic={self._attr_unique_id: str(new_val)})
+
+    def get_scene_write(
+        self, state: str | None, attributes: dict[str, Any]
+    ) -> HiqWriteRequest | None:
+        """Return the writes to bring the switch into a scene state."""
+        if state == STATE_ON:
+            return self._get_state_write(0 if self._var_invert else 1)
+        if state == STATE_OFF:
+            return self._get_state_write(1 if self._var_invert else 0)
+        return None
 
     @property
     def extra_state_attributes(self):
         """Return the state attributes."""
-        try:
-            desc = self.coordinator.data.vars[self._attr_unique_id].description
-        except KeyError:
-            desc = "?"
+        desc = self.coordinator.get_description(self._attr_unique_id)
         return {
             ATTR_DESCRIPTION: desc,
             ATTR_VARIABLE: self._attr_unique_id,
@@ -0,0 +1,197 @@
+"""Compact storage of the polled tag values of a HIQ controller."""
+from __future__ import annotations
+
+from array import array
+from math import nan
+from sys import intern
+
+from cybro import Var
+
+INVALID_VALUE = "?"
+
+
+class HiqValueStore:
+    """Polled tag values of one controller, updated in place on every poll.
+
+    Each tag is mapped once to an integer slot. Numeric values are kept in a
+    preallocated float array, invalid values ("?") in a bitmap and the values
+    which can not be rebuilt from a float as their raw string. Descriptions
+    never change and are interned once per tag. Decoded values are cached per
+    format until the value of the tag changes. The users of each polled tag
+    are counted, so a tag is only dropped from the polls with its last user.
+    """
+
+    __slots__ = (
+        "_slots",
+        "_values",
+        "_invalid",
+        "_text",
+        "_decoded",
+        "_descriptions",
+        "_users",
+    )
+
+    def __init__(self) -> None:
+        """Initialize an empty value store."""
+        self._slots: dict[str, int] = {}
+        self._values = array("d")
+        self._invalid = bytearray()
+        self._text: dict[int, str] = {}
+        self._decoded: dict[int, dict[tuple[float, int | None], str | int | float]] = {}
+        self._descriptions: list[str | None] = []
+        self._users: dict[str, int] = {}
+
+    def __contains__(self, tag: str) -> bool:
+        """Return True if a value was received for the tag."""
+        return tag in self._slots
+
+    def __len__(self) -> int:
+        """Return the number of stored tags."""
+        return len(self._slots)
+
+    def slot(self, tag: str) -> int:
+        """Return the slot of a tag, allocate a new one for unknown tags."""
+        if (index := self._slots.get(tag)) is None:
+            index = len(self._values)
+            self._slots[intern(tag)] = index
+            self._values.append(nan)
+            self._descriptions.append(None)
+            if index >> 3 >= len(self._invalid):
+                self._invalid.extend(bytes(len(self._invalid) or 16))
+            # invalid until the first value is stored
+            self._invalid[index >> 3] |= 1 << (index & 7)
+        return index
+
+    def set(self, tag: str, value: str | None, description: str | None = None) -> bool:
+        """Store the raw value (and description) of a tag.
+
+        Returns True if the value changed.
+        """
+        index = self.slot(tag)
+        if description is not None and self._descriptions[index] is None:
+            self._descriptions[index] = intern(description)
+        was_invalid = self._invalid[index >> 3] >> (index & 7) & 1
+        if value is None or value == INVALID_VALUE:
+            if was_invalid:
+                return False
+            self._invalid[index >> 3] |= 1 << (index & 7)
+            self._values[index] = nan
+            self._text.pop(index, None)
+            self._decoded.pop(index, None)
+            return True
+        try:
+            number = float(value.replace(",", ""))
+        except ValueError:
+            number = nan
+        text = value if number != number or _format(number) != value else None
+        if (
+            not was_invalid
+            and self._text.get(index) == text
+            and (text is not None or self._values[index] == number)
+        ):
+            return False
+        self._invalid[index >> 3] &= ~(1 << (index & 7))
+        self._values[index] = number
+        if text is None:
+            self._text.pop(index, None)
+        else:
+            self._text[index] = text
+        self._decoded.pop(index, None)
+        return True
+
+    def update(self, variables: dict[str, Var], skip: set[str] | None = None) -> int:
+        """Store all values of a cybro variable dict (except the tags to skip).
+
+        Returns the number of changed values.
+        """
+        changed = 0
+        for tag, var in variables.items():
+            if skip and tag in skip:
+                continue
+            if self.set(tag, var.value, var.description):
+                changed += 1
+        return changed
+
+    def use(self, tag: str) -> None:
+        """Count one more user (entity, statistics, edge capture) of a tag."""
+        self._users[tag] = self._users.get(tag, 0) + 1
+
+    def release(self, tag: str) -> bool:
+        """Count one user less of a tag, return True if no user is left."""
+        if (users := self._users.get(tag, 0) - 1) > 0:
+            self._users[tag] = users
+            return False
+        self._users.pop(tag, None)
+        return True
+
+    def is_invalid(self, tag: str) -> bool:
+        """Return True if the tag is unknown or was read as invalid."""
+        if (index := self._slots.get(tag)) is None:
+            return True
+        return bool(self._invalid[index >> 3] >> (index & 7) & 1)
+
+    def get_raw(self, tag: str) -> str | None:
+        """Return the raw value of a tag as read from the controller."""
+        if (index := self._slots.get(tag)) is None:
+            return None
+        if self._invalid[index >> 3] >> (index & 7) & 1:
+            return INVALID_VALUE
+        if (text := self._text.get(index)) is not None:
+            return text
+        return _format(self._values[index])
+
+    def get_float(self, tag: str) -> float | None:
+        """Return the numeric value of a tag, None if it is not a number."""
+        if (index := self._slots.get(tag)) is None:
+            return None
+        value = self._values[index]
+        return None if value != value else value
+
+    def get_decoded(
+        self, tag: str, factor: float = 1.0, precision: int | None = 0
+    ) -> str | int | float | None:
+        """Return the value of a tag formatted with a factor and precision.
+
+        The value is decoded once per change and format instead of on every
+        access.
+        """
+        if (index := self._slots.get(tag)) is None:
+            return None
+        if self._invalid[index >> 3] >> (index & 7) & 1:
+            return None
+        decoded = self._decoded.setdefault(index, {})
+        if (value := decoded.get(fmt := (factor, precision))) is None:
+            value = decoded[fmt] = decode_value(self.get_raw(tag), factor, precision)
+        return value
+
+    def get_description(self, tag: str) -> str | None:
+        """Return the description of a tag."""
+        if (index := self._slots.get(tag)) is None:
+            return None
+        return self._descriptions[index]
+
+
+def decode_value(
+    raw: str, factor: float = 1.0, precision: int | None = 0
+) -> str | int | float:
+    """Decode a raw tag value, scaled by a factor and rounded to a precision.
+
+    Values which are no numbers are returned as raw string.
+    """
+    if precision is None:
+        return raw
+    try:
+        # try to parse float value, if fails, try to return int, else return as string
+        if factor != 1.0 or precision != 0 or raw in (",", "."):
+            converted_numerical_value = float(raw.replace(",", "")) * factor
+            return float(f"{converted_numerical_value:z.{precision}f}")
+        return int(raw)
+    except ValueError:
+        return raw
+
+
+def _format(number: float) -> str:
+    """Return the canonical string of a polled number."""
+    if number.is_integer():
+        return str(int(number))
+    return repr(number)
@@ -16,6 +16,10 @@ from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import (
     AREA_WEATHER,
+    ATTR_PRESSURE_TENDENCY,
+    ATTR_TEMPERATURE_MAX,
+    ATTR_TEMPERATURE_MIN,
+    ATTR_WIND_SPEED_MAX,
     ATTRIBUTION_PLC,
     DEVICE_DESCRIPTION,
     DEVICE_HW_VERSION,
@@ -23,6 +27,8 @@ from .const import (
     DOMAIN,
     MANUFACTURER,
     MANUFACTURER_URL,
+    WEATHER_HISTORY_WINDOW,
+    WEATHER_TENDENCY_WINDOW,
 )
 from .coordinator import HiqDataUpdateCoordinator
 
@@ -40,19 +46,19 @@ async def async_setup_entry(
     has_weather: bool = False
     # search for any weather station var and add it into the read list
     if coordinator.data.plc_info.plc_vars.__contains__(f"{var_prefix}temperature"):
-        coordinator.data.add_var(f"{var_prefix}temperature", var_type=VarType.INT)
+        coordinator.add_var(f"{var_prefix}temperature", var_type=VarType.INT)
         has_weather = True
     if coordinator.data.plc_info.plc_vars.__contains__(f"{var_prefix}humidity"):
-        coordinator.data.add_var(f"{var_prefix}humidity", var_type=VarType.INT)
+        coordinator.add_var(f"{var_prefix}humidity", var_type=VarType.INT)
         has_weather = True
     if coordinator.data.plc_info.plc_vars.__contains__(f"{var_prefix}wind_speed"):
-        coordinator.data.add_var(f"{var_prefix}wind_speed", var_type=VarType.INT)
+        coordinator.add_var(f"{var_prefix}wind_speed", var_type=VarType.INT)
         has_weather = True
     if coordinator.data.plc_info.plc_vars.__contains__(f"{var_prefix}wind_direction"):
-        coordinator.data.add_var(f"{var_prefix}wind_direction", var_type=VarType.INT)
+        coordinator.add_var(f"{var_prefix}wind_direction", var_type=VarType.INT)
         has_weather = True
     if coordinator.data.plc_info.plc_vars.__contains__(f"{var_prefix}pressure"):
-        coordinator.data.add_var(f"{var_prefix}pressure", var_type=VarType.INT)
+        coordinator.add_var(f"{var_prefix}pressure", var_type=VarType.INT)
         has_weather = True
 
     if has_weather is True:
@@ -90,6 +96,21 @@ class HiqWeatherEntity(CoordinatorEntity, WeatherEntity):
         self._attr_native_pressure_unit = UnitOfPressure.HPA
         self._attr_attribution = ATTRIBUTION_PLC
         self._attr_device_info = device
+        self._temperature_tag = f"{var_prefix}temperature"
+        self._pressure_tag = f"{var_prefix}pressure"
+        self._humidity_tag = f"{var_prefix}humidity"
+        self._wind_speed_tag = f"{var_prefix}wind_speed"
+        self._wind_direction_tag = f"{var_prefix}wind_direction"
+        # trends without recorder queries
+        self._temperature_history = coordinator.track_history(
+            self._temperature_tag, WEATHER_HISTORY_WINDOW
+        )
+        self._wind_speed_history = coordinator.track_history(
+            self._wind_speed_tag, WEATHER_HISTORY_WINDOW
+        )
+        self._pressure_history = coordinator.track_history(
+            self._pressure_tag, WEATHER_TENDENCY_WINDOW, keep_samples=True
+        )
 
     @property
     def condition(self) -> str | None:
@@ -99,24 +120,38 @@ class HiqWeatherEntity(CoordinatorEntity, WeatherEntity):
     @property
     def native_temperature(self) -> float | None:
         """Return the temperature."""
-        return self.coordinator.get_value(f"{self._attr_unique_id}temperature", 0.1, 1)
+        return self.coordinator.get_value(self._temperature_tag, 0.1, 1)
 
     @property
     def native_pressure(self) -> float | None:
         """Return the pressure."""
-        return self.coordinator.get_value(f"{self._attr_unique_id}pressure")
+        return self.coordinator.get_value(self._pressure_tag)
 
     @property
     def humidity(self) -> float | None:
         """Return the humidity."""
-        return self.coordinator.get_value(f"{self._attr_unique_id}humidity")
+        return self.coordinator.get_value(self._humidity_tag)
 
     @property
     def native_wind_speed(self) -> float | None:
         """Return the wind speed."""
-        return self.coordinator.get_value(f"{self._attr_unique_id}wind_speed", 0.1, 1)
+        return self.coordinator.get_value(self._wind_speed_tag, 0.1, 1)
 
     @property
     def wind_bearing(self) -> int | None:
         """Return the wind bearing."""
-        return self.coordinator.get_value(f"{self._attr_unique_id}wind_direction")
+        return self.coordinator.get_value(self._wind_direction_tag)
+
+    @property
+    def extra_state_attributes(self):
+        """Return the trends of the last hours."""
+        data = {}
+        if (value := self._temperature_history.minimum) is not None:
+            data[ATTR_TEMPERATURE_MIN] = round(value * 0.1, 1)
+        if (value := self._temperature_history.maximum) is not None:
+            data[ATTR_TEMPERATURE_MAX] = round(value * 0.1, 1)
+        if (value := self._wind_speed_history.maximum) is not None:
+            data[ATTR_WIND_SPEED_MAX] = round(value * 0.1, 1)
+        if (value := self._pressure_history.change) is not None:
+            data[ATTR_PRESSURE_TENDENCY] = round(value, 1)
+        return data
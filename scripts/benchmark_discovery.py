@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""Event loop time of the entity discovery, before and after the discovery plan.
+
+Runs the discovery functions of all platforms (as called by their
+async_setup_entry) for a synthetic controller, including the construction of
+the entities, against a coordinator without a connection:
+- before: every discovery function searched all variables of the controller
+- after: the variables are grouped once in the executor (plan_discovery) and
+  the discovery functions only look at the modules they handle
+
+Needs the development requirements (scripts/setup) and the requirements of
+the integration (cybro).
+
+usage: scripts/benchmark_discovery.py [thermostats] [lights] [blinds]
+"""
+from __future__ import annotations
+
+import sys
+from collections.abc import Callable
+from functools import partial
+from pathlib import Path
+from re import search
+from time import perf_counter
+from types import SimpleNamespace
+
+from cybro import Device
+
+sys.path.insert(0, str(Path(__file__).parents[1]))
+
+from custom_components.hiq import binary_sensor  # noqa: E402
+from custom_components.hiq import button  # noqa: E402
+from custom_components.hiq import climate  # noqa: E402
+from custom_components.hiq import cover  # noqa: E402
+from custom_components.hiq import light  # noqa: E402
+from custom_components.hiq import number  # noqa: E402
+from custom_components.hiq import select  # noqa: E402
+from custom_components.hiq import sensor  # noqa: E402
+from custom_components.hiq import switch  # noqa: E402
+from custom_components.hiq.coordinator import HiqDataUpdateCoordinator  # noqa: E402
+from custom_components.hiq.discovery import HiqDiscoveryPlan  # noqa: E402
+from custom_components.hiq.discovery import plan_discovery  # noqa: E402
+from custom_components.hiq.values import HiqValueStore  # noqa: E402
+
+NAD = 1000
+PREFIX = f"c{NAD}."
+TH_TAGS = (
+    "general_error", "active", "output", "temperature", "temperature_1",
+    "humidity", "light_sensor", "max_timer", "ix00", "window_enable",
+    "demand_enable", "temperature_source", "display_mode", "fan_limit",
+    "setpoint_idle", "setpoint_offset", "setpoint_lo", "setpoint_hi",
+    "hysteresis", "max_temp", "max_time", "config_write_req",
+)  # fmt: skip
+HVAC_TAGS = (
+    "hvac_mode", "hvac_display_mode", "hvac_temperature_source",
+    "hvac_fan_option_b01", "outdoor_temperature", "outdoor_temperature_enable",
+    "wall_temperature", "setpoint_idle_heating", "setpoint_idle_cooling",
+    "weather_temperature", "weather_humidity", "power_meter_power",
+    "power_meter_voltage_1", "power_meter_general_error", "scan_time",
+    "sys.ip_port",
+)  # fmt: skip
+
+
+def plc_vars(thermostats: int, lights: int, blinds: int) -> dict[str, str]:
+    """Return the variables of a synthetic controller."""
+    tags = [f"th{i:02}_{tag}" for i in range(thermostats) for tag in TH_TAGS]
+    for i in range(lights):
+        tags += [f"lc{i:02}_qx00", f"lc{i:02}_ix00", f"lc{i:02}_general_error"]
+        tags += [f"ld{i:02}_qw00", f"ld{i:02}_ix00", f"ld{i:02}_general_error"]
+    for i in range(blinds):
+        tags += [f"bc{i:02}_blinds_position_00", f"bc{i:02}_general_error"]
+        tags += [f"bc{i:02}_qx00", f"bc{i:02}_qx01"]
+    tags += [f"ts{i:02}_temperature" for i in range(lights)]
+    tags += [f"iex{i:02}_ix{j:02}" for i in range(lights) for j in range(16)]
+    tags += HVAC_TAGS
+    return {f"{PREFIX}{tag}": "" for tag in tags}
+
+
+class HiqFullScan(HiqDiscoveryPlan):
+    """Discovery without a plan, every function gets all variables."""
+
+    def keys(self, *kinds: str) -> list[str]:
+        """Return all variables of the controller."""
+        return self.modules[""]
+
+
+def full_scan(variables: dict[str, str]) -> HiqDiscoveryPlan:
+    """Return the discovery as it was before the plan."""
+    # removed thermostat scan of button.add_hvac_tags()
+    thermostats = []
+    for key in variables:
+        grp = search(r"c\d+\.th\d+", key)
+        if grp:
+            thermostats.append(grp.group())
+    return HiqFullScan(
+        modules={"": list(variables)}, thermostats=list(dict.fromkeys(thermostats))
+    )
+
+
+def stub_coordinator(
+    variables: dict[str, str], values: HiqValueStore
+) -> HiqDataUpdateCoordinator:
+    """Return a coordinator with the polled values, without a connection."""
+    coordinator = HiqDataUpdateCoordinator.__new__(HiqDataUpdateCoordinator)
+    coordinator.unique_id = f"c{NAD}"
+    coordinator.cybro = SimpleNamespace(nad=NAD)
+    device = Device.__new__(Device)
+    device.plc_info = SimpleNamespace(nad=NAD, plc_vars=variables)
+    device.user_vars = {}
+    device.vars_types = {}
+    coordinator.data = device
+    coordinator.values = values
+    coordinator.outbox = SimpleNamespace(tags={})
+    coordinator._optimistic = {}
+    coordinator._rendered = {}
+    coordinator.history = {}
+    coordinator.entities = {}
+    coordinator.custom_entities = {}
+    return coordinator
+
+
+def discovery_functions() -> dict[str, Callable]:
+    """Return the discovery functions of the platforms by name."""
+    voltage_scales = sensor.HiqVoltageScales.__new__(sensor.HiqVoltageScales)
+    voltage_scales._factors = {}
+    return {
+        "binary_sensor.add_system_tags": binary_sensor.add_system_tags,
+        "binary_sensor.add_th_tags": binary_sensor.add_th_tags,
+        "button.add_hvac_tags": button.add_hvac_tags,
+        "climate.find_thermostats": climate.find_thermostats,
+        "cover.find_blinds": cover.find_blinds,
+        "light.find_on_off_lights": light.find_on_off_lights,
+        "light.find_dimm_lights": light.find_dimm_lights,
+        "number.add_th_tags": number.add_th_tags,
+        "number.add_hvac_tags": number.add_hvac_tags,
+        "select.add_th_tags": select.add_th_tags,
+        "select.add_hvac_tags": select.add_hvac_tags,
+        "sensor.add_system_tags": sensor.add_system_tags,
+        "sensor.find_temperatures": sensor.find_temperatures,
+        "sensor.find_power_meter": partial(
+            sensor.find_power_meter, voltage_scales=voltage_scales
+        ),
+        "sensor.add_th_tags": sensor.add_th_tags,
+        "sensor.add_hvac_tags": sensor.add_hvac_tags,
+        "switch.add_th_tags": switch.add_th_tags,
+        "switch.add_hvac_tags": switch.add_hvac_tags,
+    }
+
+
+def run_discovery(
+    variables: dict[str, str],
+    values: HiqValueStore,
+    plan: Callable[[dict[str, str]], HiqDiscoveryPlan],
+    runs: int,
+) -> tuple[float, dict[str, float], int]:
+    """Return the mean time of the plan, of each discovery function and the
+    number of entities.
+    """
+    functions = discovery_functions()
+    planned = 0.0
+    times = dict.fromkeys(functions, 0.0)
+    entities = 0
+    for _ in range(runs):
+        coordinator = stub_coordinator(variables, values)
+        start = perf_counter()
+        coordinator.discovery = plan(variables)
+        planned += perf_counter() - start
+        entities = 0
+        for name, function in functions.items():
+            start = perf_counter()
+            found = function(coordinator)
+            times[name] += perf_counter() - start
+            entities += len(found or [])
+    return planned / runs, {name: time / runs for name, time in times.items()}, entities
+
+
+def main() -> None:
+    """Print the event loop time of the discovery functions."""
+    args = [int(arg) for arg in sys.argv[1:4]]
+    thermostats, lights, blinds = args + [64, 128, 64][len(args) :]
+    variables = plc_vars(thermostats, lights, blinds)
+    values = HiqValueStore()
+    for key in variables:
+        values.set(key, "0")
+    runs = 10
+
+    # before: the thermostat scan ran on the event loop as well
+    scan, before, entities = run_discovery(variables, values, full_scan, runs)
+    # after: the plan runs in the executor
+    executor, after, _ = run_discovery(
+        variables, values, partial(plan_discovery, PREFIX), runs
+    )
+
+    lines = [
+        f"{len(variables)} variables, {entities} entities\n",
+        f"{'':32} {'before':>9} {'after':>9}\n",
+        f"{'(thermostat scan)':32} {scan * 1000:6.2f} ms {0:6.2f} ms\n",
+    ]
+    lines += [
+        f"{name:32} {time * 1000:6.2f} ms {after[name] * 1000:6.2f} ms\n"
+        for name, time in before.items()
+    ]
+    lines += [
+        f"{'event loop':32} {(scan + sum(before.values())) * 1000:6.2f} ms"
+        f" {sum(after.values()) * 1000:6.2f} ms\n",
+        f"{'executor (plan_discovery)':32} {'':9} {executor * 1000:6.2f} ms\n",
+    ]
+    sys.stdout.write("".join(lines))
+
+
+if __name__ == "__main__":
+    main()